@@ -0,0 +1,117 @@
+"""
+Micro-benchmark de la reconstrucción de abstracts de OpenAlex.
+Compara el método original (dict + sorted), el dict recorrido por posiciones densas,
+la variante NumPy y las casillas preasignadas (src/download/abstracts.py, la que usa
+el downloader) sobre índices invertidos sintéticos.
+Uso: python benchmarks/bench_abstracts.py [n_works] [words_per_abstract]
+"""
+import os
+import sys
+import time
+import random
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.download.abstracts import decode_inverted_indexes
+
+
+def decode_with_sort(index):
+    """Método original de scrape_openalex."""
+    words = {}
+    for word, positions in index.items():
+        for pos in positions:
+            words[pos] = word
+    return " ".join([words[i] for i in sorted(words.keys())])
+
+
+def decode_dense_dict(index):
+    """Dict {posición: palabra} recorrido sobre range(n); ordena solo si hay huecos."""
+    words = {pos: word for word, positions in index.items() for pos in positions}
+    try:
+        return " ".join(map(words.__getitem__, range(len(words))))
+    except KeyError:
+        return " ".join([words[pos] for pos in sorted(words)])
+
+
+def decode_numpy(indexes):
+    """
+    Lote completo con NumPy: aplana (documento, posición, palabra) de todos
+    los índices, ordena una sola vez con lexsort y corta por documento.
+    """
+    vocab = []
+    doc_ids, positions, word_ids = [], [], []
+    for doc, index in enumerate(indexes):
+        for word, pos_list in (index or {}).items():
+            word_id = len(vocab)
+            vocab.append(word)
+            doc_ids.extend([doc] * len(pos_list))
+            positions.extend(pos_list)
+            word_ids.extend([word_id] * len(pos_list))
+
+    texts = [""] * len(indexes)
+    if not word_ids:
+        return texts
+
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    positions = np.asarray(positions, dtype=np.int64)
+    word_ids = np.asarray(word_ids, dtype=np.int64)
+
+    # Orden estable por (documento, posición); entre duplicados queda al final la última palabra vista
+    order = np.lexsort((np.arange(len(word_ids)), positions, doc_ids))
+    doc_ids, positions, word_ids = doc_ids[order], positions[order], word_ids[order]
+    last = np.ones(len(word_ids), dtype=bool)
+    last[:-1] = (doc_ids[1:] != doc_ids[:-1]) | (positions[1:] != positions[:-1])
+    doc_ids, word_ids = doc_ids[last], word_ids[last]
+
+    bounds = np.flatnonzero(np.diff(doc_ids)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(doc_ids)]))
+    vocab = np.asarray(vocab, dtype=object)
+    for start, end in zip(starts, ends):
+        texts[doc_ids[start]] = " ".join(vocab[word_ids[start:end]])
+    return texts
+
+
+def synthetic_index(n_words, vocab):
+    index = {}
+    for pos in range(n_words):
+        index.setdefault(random.choice(vocab), []).append(pos)
+    return index
+
+
+def best_of(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    n_works = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_words = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    random.seed(42)
+    vocab = [f"w{i}" for i in range(5000)]
+    indexes = [synthetic_index(n_words, vocab) for _ in range(n_works)]
+
+    expected = [decode_with_sort(ix) for ix in indexes]
+    assert decode_inverted_indexes(indexes) == expected
+    assert [decode_dense_dict(ix) for ix in indexes] == expected
+    assert decode_numpy(indexes) == expected
+    # Huecos y posiciones repetidas
+    assert decode_inverted_indexes([{"a": [0, 5], "b": [2]}, {"a": [1], "b": [1, 0]}]) == ["a b a", "b b"]
+
+    print(f"📊 {n_works} abstracts x {n_words} palabras")
+    results = {
+        "dict + sorted (original)": best_of(lambda: [decode_with_sort(ix) for ix in indexes]),
+        "dict + posiciones densas": best_of(lambda: [decode_dense_dict(ix) for ix in indexes]),
+        "NumPy lexsort por lote": best_of(lambda: decode_numpy(indexes)),
+        "casillas preasignadas": best_of(lambda: decode_inverted_indexes(indexes)),
+    }
+    base = results["dict + sorted (original)"]
+    for name, seconds in results.items():
+        print(f"   • {name:<26}: {seconds * 1000:8.1f} ms  ({base / seconds:4.2f}x)  "
+              f"{n_works / seconds:,.0f} abstracts/s")
@@ -0,0 +1,111 @@
+"""
+Benchmark de extremo a extremo del downloader contra las APIs simuladas
+(src/download/mock_server.py), sin conexión a internet.
+Para cada tamaño ejecuta run_all en un proceso nuevo y mide registros por
+segundo y memoria pico (RSS máximo del proceso, sin los workers de parseo).
+Uso: python benchmarks/bench_downloader.py [--sizes 1000 10000 100000] [--sources openalex arxiv pubmed]
+                                           [--latency 0.0] [--error-rate 0.0]
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.download import downloader
+from src.download.mock_server import MockApiConfig, api_urls, serve
+from src.download.telemetry import Telemetry
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8799
+# Sin límite de peticiones contra el servidor local
+MOCK_RATE_LIMITS = {MOCK_HOST: (1e6, 1000)}
+
+
+def run_case(size, sources, base_url, results):
+    """Proceso hijo: apunta el downloader al servidor simulado y ejecuta run_all."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name, url in api_urls(base_url).items():
+            setattr(downloader, name, url)
+        downloader.DATA_DIR = data_dir
+        downloader.ARXIV_CHECKPOINT = os.path.join(data_dir, ".arxiv_checkpoint.json")
+        
+        telemetry = Telemetry()
+        start = time.perf_counter()
+        saved = asyncio.run(downloader.run_all("mock", sources, max_results=size, telemetry=telemetry,
+                                               rate_limits=MOCK_RATE_LIMITS))
+        elapsed = time.perf_counter() - start
+    
+    results.put({
+        "size": size,
+        "records": sum(saved.values()),
+        "elapsed_s": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "sources": telemetry.to_dict()
+    })
+
+
+def wait_for_server(base_url, timeout=10):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/eutils/esearch.fcgi?retmax=1", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor simulado no respondió en {base_url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del downloader con APIs simuladas")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--sources", nargs="+", default=["openalex", "arxiv", "pubmed"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia por petición del servidor (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument("--output", default=None, help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+    
+    ctx = mp.get_context("spawn")
+    config = MockApiConfig(records=max(args.sizes), latency=args.latency, error_rate=args.error_rate)
+    server = ctx.Process(target=serve, args=(config, MOCK_HOST, MOCK_PORT), daemon=True)
+    server.start()
+    base_url = f"http://{MOCK_HOST}:{MOCK_PORT}"
+    
+    rows = []
+    try:
+        wait_for_server(base_url)
+        for size in args.sizes:
+            results = ctx.Queue()
+            case = ctx.Process(target=run_case, args=(size, args.sources, base_url, results))
+            case.start()
+            rows.append(results.get())
+            case.join()
+    finally:
+        server.terminate()
+        server.join()
+    
+    print(f"\n📊 run_all contra APIs simuladas ({', '.join(args.sources)}; "
+          f"latencia {args.latency}s, errores {args.error_rate:.0%})")
+    for row in rows:
+        rate = row["records"] / row["elapsed_s"] if row["elapsed_s"] else 0.0
+        print(f"   • {row['size']:>7,} por fuente: {row['records']:>7,} registros en {row['elapsed_s']:7.2f}s "
+              f"→ {rate:9,.0f} registros/s | memoria pico {row['peak_rss_mb']:7.1f} MB")
+        for name, stats in row["sources"].items():
+            print(f"       - {name:<9} {stats['records_per_s']:9,.0f}/s  red {stats['network_time_s']:.2f}s  "
+                  f"parseo {stats['parse_time_s']:.2f}s  → {stats['bottleneck'] or '-'}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"📁 Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
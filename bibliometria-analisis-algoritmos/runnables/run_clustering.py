@@ -3,11 +3,10 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import pandas as pd
+from src.download.unified_store import load_unified, unified_available
 from src.clustering.preprocess import preprocess_series
 from src.clustering.hierarchical import run_linkage_and_dendrogram
-from src.similarity.ai_models import load_sentence_model
-from src.similarity.vector_models import compute_embeddings
+from src.similarity.embedding_cache import cached_embeddings
 
 # Rutas base
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -22,12 +21,12 @@ print("🔍 Requerimiento 3 - Análisis de clustering jerárquico")
 print(f"📂 Leyendo archivo: {INPUT_FILE}")
 
 # ---------- Validar archivo ----------
-if not os.path.exists(INPUT_FILE):
+if not unified_available(os.path.dirname(INPUT_FILE)):
     raise FileNotFoundError(f"No se encontró el archivo: {INPUT_FILE}\n"
                           f"Asegúrate de ejecutar primero run_downloader.py")
 
 # ---------- Cargar datos ----------
-df = pd.read_csv(INPUT_FILE)
+df = load_unified(os.path.dirname(INPUT_FILE), columns=["title", "abstract"])
 print(f"📄 Se cargaron {len(df)} artículos")
 
 # Seleccionar artículos: pedir al usuario o usar todos
@@ -50,12 +49,9 @@ print("\n🔧 Preprocesando textos...")
 texts = preprocess_series(subset['abstract'], do_lemmatize=False)
 print(f"✅ Textos preprocesados: {len(texts)}")
 
-# ---------- Embeddings semánticos ----------
-print("\n🤖 Cargando modelo de embeddings...")
-model = load_sentence_model()
-
-print("🧮 Generando embeddings...")
-embs = compute_embeddings(model, texts).cpu().numpy()
+# ---------- Embeddings semánticos (caché en data/embeddings) ----------
+print("\n🧮 Generando embeddings...")
+embs = cached_embeddings(texts)
 print(f"✅ Embeddings generados: {embs.shape}")
 
 # ---------- Preparar etiquetas ----------
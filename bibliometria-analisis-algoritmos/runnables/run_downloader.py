@@ -5,12 +5,18 @@ import asyncio
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.download.downloader import run_all
+from src.download.batch import run_batch, load_queries, unique_queries
+from src.download.http_cache import ResponseCache
 from src.download.merger import merge_and_deduplicate
 
 if __name__ == "__main__":
     print("🔍 Requerimiento 1 - Descarga de artículos")
 
-    query = input("🧠 Ingresa la cadena de búsqueda: ").strip()
+    query = input("🧠 Ingresa la cadena de búsqueda (varias separadas por ';' o @archivo.txt para un lote): ").strip()
+    if query.startswith("@"):
+        queries = load_queries(query[1:])
+    else:
+        queries = unique_queries(query.split(";"))
     
     print("\n📚 Bases de datos disponibles (100% ABIERTAS - Sin captcha):")
     print("1. OpenAlex    - 250M+ artículos, todas las disciplinas")
@@ -30,13 +36,24 @@ if __name__ == "__main__":
         sources = ["openalex", "arxiv", "pubmed"]
 
     max_results = int(input("\n¿Cuántos artículos deseas descargar por fuente? (recomendado: 10-50): ") or "10")
+    incremental = input("¿Descarga incremental (solo artículos nuevos)? (s/N): ").strip().lower() == "s"
+    near_duplicates = input("¿Detectar casi-duplicados por título y abstract (MinHash)? (s/N): ").strip().lower() == "s"
+    deadline = float(input("⏱️ Tiempo límite en segundos (Enter = sin límite): ") or "0") or None
 
-    print(f"\n🚀 Buscando '{query}' en {', '.join(sources)}...")
+    print(f"\n🚀 Buscando {len(queries)} consulta(s) en {', '.join(sources)}...")
     print("⚡ Usando solo APIs REST - Sin web scraping - Rápido y confiable")
     
-    asyncio.run(run_all(query=query, sources=sources, max_results=max_results))
+    # Las respuestas se guardan en data/download/.cache y se reutilizan durante 24 h
+    cache = ResponseCache()
+    if len(queries) > 1:
+        # Lote: consultas en paralelo sobre la misma sesión, sin repetir trabajos
+        asyncio.run(run_batch(queries=queries, sources=sources, max_results=max_results,
+                              cache=cache, incremental=incremental, deadline=deadline))
+    else:
+        asyncio.run(run_all(query=queries[0], sources=sources, max_results=max_results,
+                            cache=cache, incremental=incremental, deadline=deadline))
 
     print("\n🔗 Unificando resultados...")
-    merge_and_deduplicate()
+    merge_and_deduplicate(near_duplicates=near_duplicates)
     print("\n✅ Descarga y unificación completadas.")
     print("📁 Archivos guardados en: data/download/")
\ No newline at end of file
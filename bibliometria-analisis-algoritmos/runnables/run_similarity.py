@@ -4,9 +4,8 @@ import sys
 # Agregar el directorio raíz del proyecto al sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import pandas as pd
-from src.similarity.ai_models import load_sentence_model
-from src.similarity.vector_models import compute_embeddings
+from src.download.unified_store import load_unified, unified_available
+from src.similarity.embedding_cache import cached_embeddings
 from src.similarity.compare import compute_similarity
 
 # Rutas correctas desde la raíz del proyecto
@@ -22,17 +21,18 @@ print("🔍 Requerimiento 2 - Análisis de similitud semántica")
 print(f"📂 Leyendo archivo: {INPUT_FILE}")
 
 # ---------- Cargar datos ----------
-if not os.path.exists(INPUT_FILE):
+if not unified_available(DATA_DIR):
     raise FileNotFoundError(f"No se encontró el archivo: {INPUT_FILE}\n"
                           f"Asegúrate de ejecutar primero run_downloader.py")
 
-df = pd.read_csv(INPUT_FILE)
+# Solo las columnas que usa la comparación
+df = load_unified(DATA_DIR, columns=["title", "abstract"])
 
 if "abstract" not in df.columns:
     raise ValueError("El archivo unified.csv no contiene la columna 'abstract'.")
 
 # Filtrar abstracts válidos
-df["abstract"] = df["abstract"].astype(str)
+df["abstract"] = df["abstract"].fillna("").astype(str)
 original_count = len(df)
 df = df[df["abstract"].str.strip() != ""]
 filtered_count = len(df)
@@ -45,12 +45,9 @@ if original_count - filtered_count > 0:
 if len(df) == 0:
     raise ValueError("No hay abstracts válidos para procesar.")
 
-# ---------- Modelo y embeddings ----------
-print("\n🤖 Cargando modelo de embeddings...")
-model = load_sentence_model()
-
-print("🧮 Generando embeddings de abstracts...")
-embeddings = compute_embeddings(model, df["abstract"].tolist())
+# ---------- Embeddings (caché en data/embeddings, el modelo solo se carga si hay abstracts nuevos) ----------
+print("\n🧮 Generando embeddings de abstracts...")
+embeddings = cached_embeddings(df["abstract"].tolist())
 print(f"✅ Embeddings generados: {embeddings.shape}")
 
 # ---------- Comparación ----------
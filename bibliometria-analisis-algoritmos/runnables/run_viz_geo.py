@@ -3,7 +3,7 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import pandas as pd
+from src.download.unified_store import load_unified, unified_available
 from src.visualization.geography import build_heatmap
 from src.visualization.wordclouds import generate_wordcloud
 from src.visualization.timeline import plot_timeline_by_year, plot_timeline_by_journal
@@ -22,12 +22,12 @@ print("🎨 Requerimiento 4 - Visualización de datos")
 print(f"📂 Leyendo archivo: {INPUT_FILE}")
 
 # ---------- Validar archivo ----------
-if not os.path.exists(INPUT_FILE):
+if not unified_available(os.path.dirname(INPUT_FILE)):
     raise FileNotFoundError(f"No se encontró el archivo: {INPUT_FILE}\n"
                           f"Asegúrate de ejecutar primero run_downloader.py")
 
 # ---------- Cargar datos ----------
-df = pd.read_csv(INPUT_FILE)
+df = load_unified(os.path.dirname(INPUT_FILE), columns=["abstract", "keywords", "country", "year", "journal"])
 print(f"📄 Se cargaron {len(df)} artículos\n")
 
 # ---------- 1) Mapa de calor geográfico ----------
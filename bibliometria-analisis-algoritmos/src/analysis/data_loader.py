@@ -1,16 +1,18 @@
 import os
 import pandas as pd
+from src.download.unified_store import load_unified
 
 class DataLoader:
     """Carga y valida los datos bibliométricos del proyecto."""
     def __init__(self, data_dir="data/download"):
         self.data_dir = data_dir
-        self.unified_path = os.path.join(data_dir, "unified.csv")
+        self.unified_path = os.path.join(data_dir, "unified.csv")  # o unified.parquet, ver unified_store.py
         self.similarity_path = os.path.join(data_dir, "similarities.csv")
 
-    def load_unified(self):
-        df = pd.read_csv(self.unified_path)
-        print(f"✅ Cargados {len(df)} artículos desde unified.csv")
+    def load_unified(self, columns=None):
+        """Artículos unificados tipados; columns limita la lectura a esas columnas."""
+        df = load_unified(self.data_dir, columns=columns)
+        print(f"✅ Cargados {len(df)} artículos unificados")
         return df
 
     def load_similarities(self):
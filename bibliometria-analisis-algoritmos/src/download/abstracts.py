@@ -0,0 +1,42 @@
+# src/download/abstracts.py
+"""
+Reconstrucción de abstracts de OpenAlex a partir de abstract_inverted_index
+({palabra: [posiciones]}).
+- decode_inverted_index: reserva una lista de tantas casillas como posiciones
+  y coloca cada palabra en la suya, sin construir un dict ni ordenar
+- decode_inverted_indexes: lo mismo por lotes (una página completa de works)
+Huecos en las posiciones se omiten; si una posición se repite gana la última
+palabra vista, igual que el diccionario {posición: palabra} original.
+Comparación con otras variantes en benchmarks/bench_abstracts.py.
+"""
+
+
+def fill_slots(index, size):
+    slots = [None] * size
+    for word, positions in index.items():
+        for pos in positions:
+            slots[pos] = word
+    return slots
+
+
+def decode_inverted_index(index):
+    """
+    Reconstruye el texto de un abstract_inverted_index (cadena vacía si no hay).
+    Las posiciones suelen ser densas (0..n-1), así que se reservan n casillas
+    (n = total de posiciones); si alguna posición queda fuera, se reserva hasta
+    la mayor posición y se omiten los huecos.
+    """
+    if not index:
+        return ""
+    try:
+        slots = fill_slots(index, sum(map(len, index.values())))
+    except IndexError:
+        slots = fill_slots(index, max(max(p) for p in index.values() if p) + 1)
+    if None in slots:
+        return " ".join([word for word in slots if word is not None])
+    return " ".join(slots)
+
+
+def decode_inverted_indexes(indexes):
+    """Versión por lotes de decode_inverted_index."""
+    return [decode_inverted_index(index) for index in indexes]
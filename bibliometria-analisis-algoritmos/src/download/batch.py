@@ -0,0 +1,190 @@
+# src/download/batch.py
+"""
+Descarga por lotes: varias cadenas de búsqueda en un solo trabajo.
+- Todas las consultas comparten la sesión HTTP, el RateLimiter (un token
+  bucket por host, atendido en orden de llegada, así ninguna consulta acapara
+  un host) y un archivo de salida por fuente
+- Hasta max_concurrent_queries consultas corren a la vez por fuente
+- Los trabajos repetidos entre consultas se detectan al vuelo (DOI, ids de
+  arXiv/PMC/OpenAlex o título) y se guardan una sola vez
+- Qué consultas encontraron cada trabajo queda en batches/query_matches.csv
+  (fuente, clave del trabajo, título, consulta)
+- Las consultas de PubMed comparten un único pool de procesos para parsear XML
+"""
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from tqdm.asyncio import tqdm
+
+from src.download.downloader import (PARSE_WORKERS, REQUEST_TIMEOUT, TELEMETRY_FILE, cancel_tasks, consume_records,
+                                     create_session)
+from src.download.incremental import KnownWorks, work_keys
+from src.download.merger import normalize_title
+from src.download.rate_limiter import RateLimiter
+from src.download.sinks import CsvSink, open_sink, sink_path
+from src.download.sources import HarvestContext, get_source
+from src.download.telemetry import Telemetry
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data/download")
+
+# Fuera de data/download para que merger.py no lo lea como fuente
+LEDGER_FILE = os.path.join("batches", "query_matches.csv")
+LEDGER_COLUMNS = ["source", "work_key", "title", "query"]
+
+MAX_CONCURRENT_QUERIES = 4
+
+# Opciones de las fuentes en modo lote: el checkpoint de arXiv es de una sola consulta
+BATCH_SOURCE_OPTIONS = {"arxiv": {"resume": False}}
+
+
+def batch_source(name, executor=None):
+    """Instancia de la fuente para el lote; PubMed recibe el pool de procesos compartido."""
+    options = dict(BATCH_SOURCE_OPTIONS.get(name, {}))
+    if name == "pubmed" and executor is not None:
+        options["executor"] = executor
+    return get_source(name, **options)
+
+
+def load_queries(path):
+    """Lee un archivo de consultas: una por línea; se ignoran líneas vacías y comentarios (#)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return unique_queries(line for line in lines if line and not line.startswith("#"))
+
+
+def unique_queries(queries):
+    """Quita consultas vacías o repetidas conservando el orden."""
+    return list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+
+
+def record_keys(record):
+    """Claves del trabajo (work_keys) o, si no tiene DOI ni URL reconocible, su título normalizado."""
+    keys = work_keys(record.get("doi"), record.get("url"))
+    return keys or [f"title:{normalize_title(record.get('title'))}"]
+
+
+class BatchDeduper:
+    """
+    Trabajos ya guardados en el lote (por fuente) y registro de las consultas
+    que encontraron cada uno.
+    """
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.seen = {}  # fuente -> claves de los trabajos guardados en este lote
+        self.duplicates = 0
+
+    def add(self, source, query, record):
+        """Anota la coincidencia. Retorna True si el trabajo es nuevo y hay que guardarlo."""
+        seen = self.seen.setdefault(source, set())
+        keys = record_keys(record)
+        self.ledger.write({"source": source, "work_key": keys[0], "title": record.get("title", ""), "query": query})
+
+        is_new = not any(k in seen for k in keys)
+        seen.update(keys)
+        self.duplicates += not is_new
+        return is_new
+
+
+async def harvest_query(adapter, ctx, query, max_results, deduper, progress):
+    """
+    Recorre una consulta de una fuente y escribe en el sink compartido solo los
+    trabajos nuevos. Retorna True si la consulta terminó completa.
+    """
+    def save(record):
+        if deduper.add(adapter.name, query, record):
+            ctx.sink.write(record)
+        progress.update(1)
+
+    return await consume_records(adapter, ctx, query, max_results, save, label=f"{adapter.label} '{query}'")
+
+
+async def run_batch(queries, sources, max_results=10, max_concurrent_queries=MAX_CONCURRENT_QUERIES, cache=None,
+                    incremental=False, output_format="csv", deadline=None, request_timeout=REQUEST_TIMEOUT,
+                    telemetry=None, rate_limits=None, data_dir=DATA_DIR):
+    """
+    Ejecuta varias consultas sobre las fuentes seleccionadas en un solo trabajo.
+    Cada fuente escribe un único archivo (igual que run_all) con los trabajos
+    de todas las consultas sin repetir; max_results es por consulta y fuente.
+    Con incremental=True se omiten además los trabajos ya presentes en data_dir
+    y los archivos de cada fuente se continúan en lugar de reemplazarse.
+    deadline (segundos) acota el lote completo; lo ya guardado se conserva.
+    Retorna {fuente: artículos guardados}.
+    """
+    queries = unique_queries(queries)
+    print(f"\n🔍 Lote de {len(queries)} consultas")
+    print(f"📚 Fuentes seleccionadas: {', '.join(sources)}")
+    print(f"📊 Artículos por consulta y fuente: {max_results}")
+
+    adapters = []
+    for src in sources:
+        adapter = batch_source(src)
+        if adapter is not None:
+            adapters.append(adapter)
+        else:
+            print(f"⚠️ Fuente desconocida: {src}")
+
+    limiter = RateLimiter(rate_limits)
+    for adapter in adapters:
+        adapter.configure_limiter(limiter)
+    known = KnownWorks.from_dir(data_dir) if incremental else None
+    telemetry = telemetry or Telemetry()
+
+    ledger_path = os.path.join(data_dir, LEDGER_FILE)
+    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+    sinks = {
+        adapter.name: open_sink(sink_path(data_dir, adapter.name, output_format), output_format, append=incremental)
+        for adapter in adapters
+    }
+
+    # Un solo pool para todas las consultas de PubMed (no uno por consulta)
+    executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS) if any(a.name == "pubmed" for a in adapters) else None
+    finished = {adapter.name: 0 for adapter in adapters}  # consultas completas por fuente
+    tasks = {}
+    with CsvSink(ledger_path, columns=LEDGER_COLUMNS) as ledger:
+        deduper = BatchDeduper(ledger)
+        try:
+            async with create_session(request_timeout=request_timeout) as session:
+                progress = tqdm(total=len(queries) * len(adapters) * max_results, desc="Lote artículos")
+
+                async def run_source_query(adapter, query, slots):
+                    stats = telemetry.source(adapter.name)
+                    ctx = HarvestContext(session, limiter, cache, known, sinks[adapter.name], stats)
+                    async with slots:
+                        # Cada consulta usa su propia instancia de la fuente
+                        source = batch_source(adapter.name, executor)
+                        if await harvest_query(source, ctx, query, max_results, deduper, progress):
+                            finished[adapter.name] += 1
+
+                for adapter in adapters:
+                    telemetry.source(adapter.name).start()
+                    slots = asyncio.Semaphore(max_concurrent_queries)
+                    for query in queries:
+                        task = asyncio.create_task(run_source_query(adapter, query, slots))
+                        tasks[task] = adapter.name
+
+                try:
+                    if tasks:
+                        await asyncio.wait(tasks, timeout=deadline)
+                finally:
+                    stopped = await cancel_tasks(tasks)
+                    progress.close()
+                    if stopped and deadline:
+                        print(f"\n⏱️ Tiempo límite alcanzado: {len(stopped)} consulta(s) detenida(s)")
+        finally:
+            # Una fuente con consultas incompletas y sin registros conserva su archivo anterior
+            for name, sink in sinks.items():
+                sink.close(completed=finished[name] == len(queries))
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    for name, sink in sinks.items():
+        telemetry.source(name).stop(sink.count)
+        print(f"✅ Guardado {sink.count} artículos de {name}")
+    print(f"♻️ Coincidencias repetidas entre consultas: {deduper.duplicates}")
+    print(f"🧾 Consultas por trabajo en {ledger_path}")
+    telemetry.print_summary()
+    print(f"📁 Métricas en {telemetry.export_json(os.path.join(data_dir, TELEMETRY_FILE))}")
+
+    return {name: sink.count for name, sink in sinks.items()}
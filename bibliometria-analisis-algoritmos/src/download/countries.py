@@ -0,0 +1,196 @@
+# src/download/countries.py
+"""
+Resolución de países a partir de textos de afiliación.
+- Tabla de alias extensible (COUNTRY_ALIASES) y códigos ISO (ISO_COUNTRY_CODES)
+- Una sola expresión regular compilada con todas las variantes, con límites de
+  palabra: "US" ya no coincide dentro de "Australia" o "status"
+- Las siglas en mayúsculas (USA, UK, US) se comparan respetando mayúsculas para
+  no confundir "US" con el pronombre "us"
+- Un único recorrido del texto devuelve todos los países mencionados
+"""
+import re
+
+COUNTRY_ALIASES = {
+    'United States': ['USA', 'United States', 'U.S.A', 'U.S.', 'US'],
+    'United Kingdom': ['UK', 'United Kingdom', 'U.K.', 'England', 'Scotland', 'Wales'],
+    'China': ['China', 'P.R. China', 'PR China'],
+    'Germany': ['Germany', 'Deutschland'],
+    'France': ['France'],
+    'Japan': ['Japan'],
+    'Canada': ['Canada'],
+    'Australia': ['Australia'],
+    'India': ['India'],
+    'Brazil': ['Brazil', 'Brasil'],
+    'Spain': ['Spain', 'España'],
+    'Italy': ['Italy', 'Italia'],
+    'Netherlands': ['Netherlands', 'Holland'],
+    'Switzerland': ['Switzerland', 'Suisse'],
+    'South Korea': ['South Korea', 'Korea', 'Republic of Korea'],
+    'Sweden': ['Sweden'],
+    'Russia': ['Russia', 'Russian Federation'],
+    'Mexico': ['Mexico', 'México'],
+    'Argentina': ['Argentina'],
+    'Colombia': ['Colombia'],
+    'Chile': ['Chile'],
+    'Peru': ['Peru', 'Perú'],
+    'Israel': ['Israel'],
+    'South Africa': ['South Africa'],
+    'Singapore': ['Singapore'],
+    'New Zealand': ['New Zealand'],
+    'Belgium': ['Belgium'],
+    'Austria': ['Austria'],
+    'Poland': ['Poland'],
+    'Denmark': ['Denmark'],
+    'Finland': ['Finland'],
+    'Norway': ['Norway'],
+    'Ireland': ['Ireland'],
+    'Portugal': ['Portugal'],
+    'Greece': ['Greece'],
+    'Turkey': ['Turkey', 'Türkiye'],
+    'Iran': ['Iran'],
+    'Saudi Arabia': ['Saudi Arabia'],
+    'Egypt': ['Egypt'],
+    'Taiwan': ['Taiwan'],
+    'Thailand': ['Thailand'],
+    'Malaysia': ['Malaysia'],
+    'Indonesia': ['Indonesia'],
+    'Pakistan': ['Pakistan'],
+    'Vietnam': ['Vietnam'],
+    'Czech Republic': ['Czech Republic', 'Czechia'],
+    'Hungary': ['Hungary'],
+    'Romania': ['Romania'],
+    'Ukraine': ['Ukraine']
+}
+
+ISO_COUNTRY_CODES = {
+    'US': 'United States',
+    'GB': 'United Kingdom',
+    'CN': 'China',
+    'DE': 'Germany',
+    'FR': 'France',
+    'JP': 'Japan',
+    'CA': 'Canada',
+    'AU': 'Australia',
+    'IN': 'India',
+    'BR': 'Brazil',
+    'ES': 'Spain',
+    'IT': 'Italy',
+    'NL': 'Netherlands',
+    'CH': 'Switzerland',
+    'KR': 'South Korea',
+    'SE': 'Sweden',
+    'RU': 'Russia',
+    'MX': 'Mexico',
+    'AR': 'Argentina',
+    'CO': 'Colombia',
+    'CL': 'Chile',
+    'PE': 'Peru',
+    'IL': 'Israel',
+    'ZA': 'South Africa',
+    'SG': 'Singapore',
+    'NZ': 'New Zealand',
+    'BE': 'Belgium',
+    'AT': 'Austria',
+    'PL': 'Poland',
+    'DK': 'Denmark',
+    'FI': 'Finland',
+    'NO': 'Norway',
+    'IE': 'Ireland',
+    'PT': 'Portugal',
+    'GR': 'Greece',
+    'TR': 'Turkey',
+    'IR': 'Iran',
+    'SA': 'Saudi Arabia',
+    'EG': 'Egypt',
+    'TW': 'Taiwan',
+    'TH': 'Thailand',
+    'MY': 'Malaysia',
+    'ID': 'Indonesia',
+    'PK': 'Pakistan',
+    'VN': 'Vietnam',
+    'CZ': 'Czech Republic',
+    'HU': 'Hungary',
+    'RO': 'Romania',
+    'UA': 'Ukraine'
+}
+
+
+class CountryMatcher:
+    """Buscador de países compilado una sola vez sobre una tabla de alias."""
+
+    def __init__(self, aliases=None):
+        self.aliases = {country: list(names) for country, names in (aliases or COUNTRY_ALIASES).items()}
+        self._compile()
+
+    def _compile(self):
+        self._lookup = {}
+        variants = set()
+        for country, names in self.aliases.items():
+            for name in [country] + names:
+                self._lookup[name.lower()] = country
+                variants.add(name)
+        # Alternativas más largas primero: "South Korea" antes que "Korea", "U.S.A" antes que "U.S."
+        parts = []
+        for name in sorted(variants, key=len, reverse=True):
+            if name.isupper():
+                parts.append(f"(?-i:{re.escape(name)})")
+            else:
+                parts.append(re.escape(name))
+        self._pattern = re.compile(r"(?<!\w)(?:" + "|".join(parts) + r")(?!\w)", re.IGNORECASE)
+
+    def add_aliases(self, country, names):
+        """Agrega alias (o un país nuevo) y recompila el patrón."""
+        self.aliases.setdefault(country, [])
+        self.aliases[country].extend(n for n in names if n not in self.aliases[country])
+        self._compile()
+
+    def find_all(self, text):
+        """Todos los países mencionados, sin repetir, en orden de aparición."""
+        if not text:
+            return []
+        found = []
+        for match in self._pattern.finditer(text):
+            country = self._lookup[match.group(0).lower()]
+            if country not in found:
+                found.append(country)
+        return found
+
+    def first(self, text):
+        """Primer país mencionado en el texto o cadena vacía."""
+        if not text:
+            return ""
+        match = self._pattern.search(text)
+        return self._lookup[match.group(0).lower()] if match else ""
+
+    def first_batch(self, texts):
+        """Primer país de cada texto; los textos repetidos se resuelven una sola vez."""
+        resolved = {}
+        results = []
+        for text in texts:
+            if text not in resolved:
+                resolved[text] = self.first(text)
+            results.append(resolved[text])
+        return results
+
+
+DEFAULT_MATCHER = CountryMatcher()
+
+
+def extract_country_from_text(text):
+    """
+    Extrae el país de un texto usando patrones comunes.
+    Retorna el primer país encontrado o cadena vacía.
+    """
+    return DEFAULT_MATCHER.first(text)
+
+
+def extract_countries_from_texts(texts):
+    """Versión por lotes de extract_country_from_text para una lista de afiliaciones."""
+    return DEFAULT_MATCHER.first_batch(texts)
+
+
+def get_country_name_from_code(code):
+    """
+    Convierte código de país ISO a nombre completo.
+    """
+    return ISO_COUNTRY_CODES.get((code or "").upper(), "")
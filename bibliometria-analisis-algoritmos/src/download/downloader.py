@@ -2,512 +2,845 @@
 Downloader con APIs REST completamente abiertas - Sin web scraping.
 Bases de datos: OpenAlex, arXiv, PubMed Central
 Incluye extracción de país de afiliación/autores
+Cada base es una fuente registrada en sources.SOURCES; run_all las ejecuta en paralelo.
 """
 
 import os
 import re
+import json
+import time
 import asyncio
-import pandas as pd
-from urllib.parse import quote_plus
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 from tqdm.asyncio import tqdm
 import aiohttp
 import feedparser
 from datetime import datetime
+from src.download.http_cache import CacheMiss
+from src.download.incremental import KnownWorks
+from src.download.sinks import SINK_EXTENSIONS, count_rows, open_sink, sink_path
+from src.download.countries import extract_country_from_text, get_country_name_from_code
+from src.download.pmc_parser import parse_pmc_articleset
+from src.download.abstracts import decode_inverted_index, decode_inverted_indexes
+from src.download.rate_limiter import RateLimiter, RETRY_STATUSES, backoff_delay, parse_retry_after
+from src.download.telemetry import Telemetry, SourceStats, timed_call
+from src.download.sources import HarvestContext, SourceAdapter, register_source, get_source
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data/download")
 os.makedirs(DATA_DIR, exist_ok=True)
+TELEMETRY_FILE = "telemetry.json"
 
-# ------------------ Helper para extraer país ------------------
-
-def extract_country_from_text(text):
-    """
-    Extrae el país de un texto usando patrones comunes.
-    Retorna el primer país encontrado o cadena vacía.
-    """
-    if not text:
-        return ""
-    
-    # Lista de países comunes (puedes expandirla)
-    countries = {
-        'United States': ['USA', 'United States', 'U.S.A', 'U.S.', 'US'],
-        'United Kingdom': ['UK', 'United Kingdom', 'U.K.', 'England', 'Scotland', 'Wales'],
-        'China': ['China', 'P.R. China', 'PR China'],
-        'Germany': ['Germany', 'Deutschland'],
-        'France': ['France'],
-        'Japan': ['Japan'],
-        'Canada': ['Canada'],
-        'Australia': ['Australia'],
-        'India': ['India'],
-        'Brazil': ['Brazil', 'Brasil'],
-        'Spain': ['Spain', 'España'],
-        'Italy': ['Italy', 'Italia'],
-        'Netherlands': ['Netherlands', 'Holland'],
-        'Switzerland': ['Switzerland', 'Suisse'],
-        'South Korea': ['South Korea', 'Korea', 'Republic of Korea'],
-        'Sweden': ['Sweden'],
-        'Russia': ['Russia', 'Russian Federation'],
-        'Mexico': ['Mexico', 'México'],
-        'Argentina': ['Argentina'],
-        'Colombia': ['Colombia'],
-        'Chile': ['Chile'],
-        'Peru': ['Peru', 'Perú'],
-        'Israel': ['Israel'],
-        'South Africa': ['South Africa'],
-        'Singapore': ['Singapore'],
-        'New Zealand': ['New Zealand'],
-        'Belgium': ['Belgium'],
-        'Austria': ['Austria'],
-        'Poland': ['Poland'],
-        'Denmark': ['Denmark'],
-        'Finland': ['Finland'],
-        'Norway': ['Norway'],
-        'Ireland': ['Ireland'],
-        'Portugal': ['Portugal'],
-        'Greece': ['Greece'],
-        'Turkey': ['Turkey', 'Türkiye'],
-        'Iran': ['Iran'],
-        'Saudi Arabia': ['Saudi Arabia'],
-        'Egypt': ['Egypt'],
-        'Taiwan': ['Taiwan'],
-        'Thailand': ['Thailand'],
-        'Malaysia': ['Malaysia'],
-        'Indonesia': ['Indonesia'],
-        'Pakistan': ['Pakistan'],
-        'Vietnam': ['Vietnam'],
-        'Czech Republic': ['Czech Republic', 'Czechia'],
-        'Hungary': ['Hungary'],
-        'Romania': ['Romania'],
-        'Ukraine': ['Ukraine']
-    }
+
+# ------------------ Sesión HTTP compartida ------------------
+
+MAX_RETRIES = 4
+
+# Tiempo máximo por petición (cada reintento tiene el suyo), en segundos
+REQUEST_TIMEOUT = 60
+CONNECT_TIMEOUT = 10
+
+COMPRESSION_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+HTTP_HEADERS = {
+    **COMPRESSION_HEADERS,
+    "User-Agent": "bibliometria_app (mailto:research@example.com)"
+}
+
+def create_session(limit=20, limit_per_host=4, keepalive_timeout=30, request_timeout=REQUEST_TIMEOUT):
+    """
+    Crea una sesión aiohttp con un pool de conexiones acotado por host,
+    keep-alive y respuestas comprimidas (gzip/deflate).
+    Cada petición tiene un tiempo máximo (request_timeout); al vencer cuenta
+    como error de red y fetch la reintenta.
+    Pensada para compartirse entre todas las fuentes de una misma descarga.
+    """
+    timeout = aiohttp.ClientTimeout(total=request_timeout, sock_connect=CONNECT_TIMEOUT)
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, auto_decompress=True, timeout=timeout)
+
+@asynccontextmanager
+async def session_scope(session=None):
+    """
+    Reutiliza la sesión recibida o, si no hay ninguna, abre (y cierra) una propia.
+    """
+    if session is not None:
+        yield session
+    else:
+        async with create_session() as own_session:
+            yield own_session
+
+def wire_bytes(response, body):
+    """
+    Bytes del cuerpo tal como llegaron por la red (comprimidos). aiohttp los
+    cuenta en total_raw_bytes; si la versión no lo expone se usa Content-Length
+    y, sin él, el largo del cuerpo.
+    """
+    raw = getattr(response.content, "total_raw_bytes", None)
+    if raw:
+        return raw
+    return response.content_length if response.content_length is not None else len(body)
+
+async def fetch(session, url, params=None, cache=None, ttl=None, limiter=None, max_retries=MAX_RETRIES, stats=None):
+    """
+    GET con caché de respuestas opcional (ver http_cache.ResponseCache).
+    Retorna (status, cuerpo en bytes). En modo replay, una petición que no
+    está en caché lanza CacheMiss en lugar de ir a la red.
+    Cada intento ocupa un lugar y un token del limitador del host (ver rate_limiter) y
+    los 429/5xx o errores de red se reintentan con backoff exponencial,
+    respetando Retry-After cuando el servidor lo envía.
+    stats (telemetry.SourceStats) acumula latencia, bytes (de red y descomprimidos), reintentos y la
+    espera impuesta por el limitador y por los reintentos.
+    """
+    stats = stats or SourceStats("")
+    if cache is not None:
+        body = cache.get(url, params, ttl=ttl)
+        if body is not None:
+            stats.record_cache_hit(len(body))
+            return 200, body
+        if cache.replay:
+            raise CacheMiss(f"Sin respuesta en caché para {url}")
+    
+    limiter = limiter or RateLimiter()
+    attempt = 0
+    while True:
+        queued = time.perf_counter()
+        started = None
+        try:
+            async with limiter.slot(url):
+                started = time.perf_counter()
+                stats.record_wait(started - queued)
+                # Compresión pedida en cada petición, también con sesiones no creadas aquí
+                async with session.get(url, params=params, headers=COMPRESSION_HEADERS) as response:
+                    status = response.status
+                    if status in RETRY_STATUSES and attempt < max_retries:
+                        delay = parse_retry_after(response.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = backoff_delay(attempt)
+                        stats.record_request(time.perf_counter() - started, 0)
+                    else:
+                        body = await response.read()
+                        stats.record_request(time.perf_counter() - started, wire_bytes(response, body), len(body))
+                        if status == 200 and cache is not None:
+                            cache.set(url, params, body)
+                        return status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if started is not None:
+                stats.record_request(time.perf_counter() - started, 0)
+            if attempt >= max_retries:
+                raise
+            status, delay = "error de red", backoff_delay(attempt)
+        
+        stats.record_retry(network_error=status == "error de red")
+        stats.record_wait(delay)
+        print(f"🔁 Reintentando {url} en {delay:.1f}s ({status}, intento {attempt + 1}/{max_retries})")
+        limiter.pause(url, delay)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+# ------------------ Ejecución común de una fuente ------------------
+
+async def consume_records(adapter, ctx, query, max_results, on_record, label=None):
+    """
+    Recorre adapter.iter_records y entrega cada registro a on_record(record).
+    El generador se cierra siempre al salir (libera executors y peticiones en
+    curso). La cancelación (tiempo límite) y los errores de la fuente se
+    informan y no se propagan: lo ya entregado se conserva.
+    Retorna True si la consulta terminó completa (y llama a adapter.on_complete).
+    """
+    label = label or adapter.label
+    records = adapter.iter_records(ctx, query, max_results)
+    try:
+        async for record in records:
+            on_record(record)
+        adapter.on_complete(query)
+        return True
+    except asyncio.CancelledError:
+        print(f"⏱️ {label} detenido por tiempo límite")
+    except Exception as e:
+        print(f"⚠️ {label} falló: {e}")
+    finally:
+        await records.aclose()
+    return False
+
+async def harvest_source(adapter, query, max_results=10, session=None, cache=None, limiter=None, known=None, output_format="csv",
+                         stats=None):
+    """
+    Ejecuta una fuente completa: abre su sink, recorre adapter.iter_records y
+    vuelca cada registro a medida que llega. Es el paso común a todas las
+    fuentes (sesión, esquema, escritura y resumen).
+    Con known solo se agregan los trabajos nuevos (modo incremental).
+    Si la tarea se cancela (p. ej. al vencer el tiempo límite de run_all) se
+    vuelca lo ya recibido y se retorna igual, sin propagar la cancelación.
+    stats (telemetry.SourceStats) recibe las métricas de la fuente.
+    Retorna la cantidad de registros guardados.
+    """
+    print(f"\n[{adapter.label}] Extrayendo artículos vía API...")
     
-    text_lower = text.lower()
+    limiter = limiter or RateLimiter()
+    stats = stats or SourceStats(adapter.name)
+    path = sink_path(DATA_DIR, adapter.name, output_format)
+    sink = None
+    with_country = 0
+    stats.start()
+    try:
+        resume = adapter.append_output(query, path, max_results, incremental=known is not None)
+        sink = open_sink(path, output_format, append=resume or known is not None)
+        completed = False
+        try:
+            async with session_scope(session) as session:
+                ctx = HarvestContext(session, limiter, cache, known, sink, stats)
+                with tqdm(total=max_results, desc=f"{adapter.label} artículos") as progress:
+                    def save(record):
+                        nonlocal with_country
+                        sink.write(record)
+                        with_country += bool(record["country"])
+                        progress.update(1)
+                    completed = await consume_records(adapter, ctx, query, max_results, save)
+        finally:
+            # Si no terminó y no trajo registros, el archivo anterior se conserva
+            sink.close(completed=completed)
+        
+        if completed:
+            print(f"✅ Guardado {sink.count} artículos de {adapter.label}")
+            print(f"   📍 Artículos con país: {with_country}")
+        elif sink.count:
+            print(f"   💾 {sink.count} artículos guardados antes de detenerse")
+        
+    except asyncio.CancelledError:
+        print(f"⏱️ {adapter.label} detenido por tiempo límite")
+        if sink is not None:
+            print(f"   💾 {sink.count} artículos guardados antes de detenerse")
     
-    # Buscar países en el texto
-    for country, aliases in countries.items():
-        for alias in aliases:
-            if alias.lower() in text_lower:
-                return country
+    except Exception as e:
+        print(f"⚠️ {adapter.label} falló: {e}")
+        if sink is not None and sink.count:
+            print(f"   💾 {sink.count} artículos guardados antes del error")
     
-    return ""
+    saved = sink.count if sink is not None else 0
+    stats.stop(saved)
+    return saved
 
 # ------------------ OpenAlex (API REST) ------------------
 
-async def scrape_openalex(query, max_results=10):
+OPENALEX_URL = "https://api.openalex.org/works"
+OPENALEX_PAGE_SIZE = 200  # Máximo permitido por OpenAlex
+# Campos de primer nivel que usa parse_openalex_work (proyección con select=)
+OPENALEX_SELECT = "id,doi,title,publication_year,authorships,abstract_inverted_index,primary_location"
+
+def parse_openalex_work(work, abstract_text=None):
+    """
+    Convierte un objeto work de OpenAlex al esquema común.
+    Retorna None si el trabajo no tiene título.
+    abstract_text permite pasar el abstract ya reconstruido (ver iter_openalex).
+    """
+    title = work.get("title") or ""
+    if not title:
+        return None
+    
+    # Autores y países
+    authorships = work.get("authorships") or []
+    authors = ", ".join([
+        (auth.get("author") or {}).get("display_name") or ""
+        for auth in authorships
+    ])
+    
+    # Extraer país de instituciones
+    country = ""
+    for authorship in authorships:
+        institutions = authorship.get("institutions") or []
+        for inst in institutions:
+            # OpenAlex tiene el país en la institución
+            country_code = inst.get("country_code") or ""
+            if country_code:
+                # Convertir código a nombre completo
+                country_name = get_country_name_from_code(country_code)
+                if country_name:
+                    country = country_name
+                    break
+            
+            # Si no hay código, buscar en el nombre de la institución
+            if not country:
+                inst_name = inst.get("display_name") or ""
+                country = extract_country_from_text(inst_name)
+                if country:
+                    break
+        
+        if country:
+            break
+    
+    # Abstract desde inverted index
+    if abstract_text is None:
+        abstract_text = decode_inverted_index(work.get("abstract_inverted_index"))
+    
+    # DOI
+    doi = (work.get("doi") or "").replace("https://doi.org/", "")
+    
+    # Año
+    year = str(work.get("publication_year") or "")
+    
+    # Journal
+    journal = ""
+    primary_location = work.get("primary_location") or {}
+    if primary_location:
+        source = primary_location.get("source") or {}
+        journal = source.get("display_name") or ""
+    
+    # URL
+    url = work.get("id") or ""
+    
+    return {
+        "title": title,
+        "authors": authors,
+        "abstract": abstract_text,
+        "doi": doi,
+        "year": year,
+        "journal": journal,
+        "url": url,
+        "country": country,
+        "source": "OpenAlex"
+    }
+
+async def iter_openalex(session, query, max_results=10, per_page=OPENALEX_PAGE_SIZE, cache=None, limiter=None, known=None, lean=True,
+                        stats=None):
+    """
+    Generador asíncrono que recorre OpenAlex con paginación por cursor (cursor=*).
+    La página siguiente se solicita mientras se procesa la actual y los
+    registros se entregan a medida que llegan, sin acumular el resultado completo.
+    Una página que sigue fallando tras los reintentos lanza RuntimeError.
+    Con known (incremental.KnownWorks) se ordena por fecha de publicación
+    descendente, se omiten los trabajos conocidos y se detiene en la primera
+    página en la que todos ya estaban descargados.
+    Con lean=True solo se piden los campos que se usan (select=), sin conceptos,
+    ubicaciones secundarias ni referencias; el JSON se decodifica directamente
+    desde los bytes de la respuesta.
+    """
+    limiter = limiter or RateLimiter()
+    stats = stats or SourceStats("openalex")
+    params = {
+        "search": query,
+        "per_page": min(per_page, max_results),
+        "mailto": "research@example.com"
+    }
+    if known is not None:
+        params["sort"] = "publication_date:desc"
+    if lean:
+        params["select"] = OPENALEX_SELECT
+    
+    async def fetch_page(cursor):
+        status, body = await fetch(session, OPENALEX_URL, {**params, "cursor": cursor}, cache, limiter=limiter, stats=stats)
+        if status != 200:
+            raise RuntimeError(f"Error en API: {status}")
+        with stats.parsing():
+            return json.loads(body)
+    
+    remaining = max_results
+    pending = asyncio.ensure_future(fetch_page("*"))
+    try:
+        while pending is not None:
+            data = await pending
+            pending = None
+            if not data:
+                break
+            
+            works = data.get("results", [])[:remaining]
+            remaining -= len(works)
+            
+            # Pedir la siguiente página antes de procesar la actual
+            next_cursor = (data.get("meta") or {}).get("next_cursor")
+            if next_cursor and works and remaining > 0:
+                pending = asyncio.ensure_future(fetch_page(next_cursor))
+            
+            records = []
+            with stats.parsing():
+                # Abstracts de toda la página en un solo lote
+                abstracts = decode_inverted_indexes([w.get("abstract_inverted_index") for w in works])
+                for work, abstract_text in zip(works, abstracts):
+                    try:
+                        record = parse_openalex_work(work, abstract_text)
+                    except Exception as e:
+                        print(f"⚠️ Error procesando artículo: {e}")
+                        continue
+                    if record and (known is None or not known.contains(record)):
+                        records.append(record)
+            
+            new_in_page = len(records)
+            for record in records:
+                yield record
+            
+            if known is not None and works and new_in_page == 0:
+                break
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+@register_source
+class OpenAlexSource(SourceAdapter):
+    name = "openalex"
+    label = "OpenAlex"
+    hosts = ("api.openalex.org",)
+    concurrency = 2  # Página actual + la siguiente (prefetch)
+    
+    def __init__(self, lean=True):
+        self.lean = lean
+    
+    async def iter_records(self, ctx, query, max_results):
+        async for record in iter_openalex(ctx.session, query, max_results, cache=ctx.cache,
+                                          limiter=ctx.limiter, known=ctx.known, lean=self.lean, stats=ctx.stats):
+            yield record
+
+async def scrape_openalex(query, max_results=10, lean=True, **options):
     """
     OpenAlex - API pública sin API key.
     https://docs.openalex.org/
+    options: session, cache, limiter, known, output_format (ver harvest_source).
     """
-    print("\n[OpenAlex] Extrayendo artículos vía API...")
+    return await harvest_source(OpenAlexSource(lean=lean), query, max_results, **options)
+
+# ------------------ arXiv (API REST) ------------------
+
+ARXIV_URL = "http://export.arxiv.org/api/query"
+ARXIV_PAGE_SIZE = 100
+ARXIV_CHECKPOINT = os.path.join(DATA_DIR, ".arxiv_checkpoint.json")
+
+def parse_arxiv_entry(entry):
+    """
+    Convierte una entrada Atom de arXiv al esquema común.
+    Retorna None si le falta título o abstract.
+    """
+    title = entry.title.replace("\n", " ").strip()
+    
+    # Autores
+    authors = ", ".join([author.name for author in entry.authors])
+    
+    # Intentar extraer afiliación de comentarios
+    country = ""
+    if hasattr(entry, 'arxiv_comment'):
+        country = extract_country_from_text(entry.arxiv_comment)
     
+    # Abstract
+    abstract = entry.summary.replace("\n", " ").strip()
+    
+    # DOI
+    doi = entry.get("arxiv_doi", "")
+    
+    # Año
+    published = entry.published
+    year = published.split("-")[0] if published else ""
+    
+    # Journal/Category
+    categories = [tag.term for tag in entry.get("tags", [])]
+    journal = f"arXiv: {', '.join(categories[:2])}"
+    
+    # URL
+    url = entry.id
+    
+    if not (title and abstract):
+        return None
+    
+    return {
+        "title": title,
+        "authors": authors,
+        "abstract": abstract,
+        "doi": doi,
+        "year": year,
+        "journal": journal,
+        "url": url,
+        "country": country,
+        "source": "arXiv"
+    }
+
+def arxiv_sort_params(incremental=False):
+    """Orden de los resultados: el modo incremental recorre de lo más reciente a lo más antiguo."""
+    if incremental:
+        return {"sortBy": "submittedDate", "sortOrder": "descending"}
+    return {}
+
+def load_arxiv_checkpoint(query, sort=None, max_results=None, path=None):
+    """
+    Retorna el checkpoint ({offset, path, rows, ...}) o None si no hay uno de
+    la misma consulta con el mismo orden, max_results y archivo de salida
+    (los offsets de otro orden apuntan a otros artículos).
+    """
     try:
-        base_url = "https://api.openalex.org/works"
+        with open(ARXIV_CHECKPOINT, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (checkpoint.get("query") != query or checkpoint.get("sort", {}) != (sort or {})
+            or checkpoint.get("max_results") != max_results
+            or (path is not None and checkpoint.get("path") != os.path.abspath(path))):
+        return None
+    return checkpoint
+
+def save_arxiv_checkpoint(query, offset, sort=None, max_results=None, path=None, rows=None):
+    """Anota el offset completado, el archivo que guarda esas ventanas y sus filas de datos."""
+    tmp = ARXIV_CHECKPOINT + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"query": query, "offset": offset, "sort": sort or {}, "max_results": max_results,
+                   "path": os.path.abspath(path) if path else None, "rows": rows}, f)
+    os.replace(tmp, ARXIV_CHECKPOINT)
+
+def clear_arxiv_checkpoint():
+    if os.path.exists(ARXIV_CHECKPOINT):
+        os.remove(ARXIV_CHECKPOINT)
+
+async def iter_arxiv_windows(session, query, max_results=10, start=0, page_size=ARXIV_PAGE_SIZE, cache=None, limiter=None, known=None,
+                             stats=None):
+    """
+    Generador asíncrono que recorre arXiv en ventanas start/max_results.
+    Cada ventana se parsea por separado y se entrega como (offset_siguiente, registros).
+    La pausa de cortesía de arXiv (3 s entre peticiones) la impone el limitador del host.
+    Lanza RuntimeError si una ventana falla, para que el llamador conserve el checkpoint.
+    Con known se recorre de lo más reciente a lo más antiguo, se omiten los
+    artículos conocidos y se detiene en la primera ventana sin novedades.
+    """
+    limiter = limiter or RateLimiter()
+    stats = stats or SourceStats("arxiv")
+    offset = start
+    while offset < max_results:
+        window = min(page_size, max_results - offset)
         params = {
-            "search": query,
-            "per_page": max_results,
-            "mailto": "research@example.com"
+            "search_query": f"all:{query}",
+            "start": offset,
+            "max_results": window
         }
+        params.update(arxiv_sort_params(known is not None))
+        status, content = await fetch(session, ARXIV_URL, params, cache, limiter=limiter, stats=stats)
+        if status != 200:
+            raise RuntimeError(f"Error en API: {status} (offset {offset})")
         
-        results = []
-        async with aiohttp.ClientSession() as session:
-            async with session.get(base_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for work in tqdm(data.get("results", []), desc="OpenAlex artículos"):
-                        try:
-                            title = work.get("title", "")
-                            
-                            # Autores y países
-                            authorships = work.get("authorships", [])
-                            authors = ", ".join([
-                                auth.get("author", {}).get("display_name", "")
-                                for auth in authorships
-                            ])
-                            
-                            # Extraer país de instituciones
-                            country = ""
-                            for authorship in authorships:
-                                institutions = authorship.get("institutions", [])
-                                for inst in institutions:
-                                    # OpenAlex tiene el país en la institución
-                                    country_code = inst.get("country_code", "")
-                                    if country_code:
-                                        # Convertir código a nombre completo
-                                        country_name = get_country_name_from_code(country_code)
-                                        if country_name:
-                                            country = country_name
-                                            break
-                                    
-                                    # Si no hay código, buscar en el nombre de la institución
-                                    if not country:
-                                        inst_name = inst.get("display_name", "")
-                                        country = extract_country_from_text(inst_name)
-                                        if country:
-                                            break
-                                
-                                if country:
-                                    break
-                            
-                            # Abstract desde inverted index
-                            abstract = work.get("abstract_inverted_index", {})
-                            if abstract:
-                                words = {}
-                                for word, positions in abstract.items():
-                                    for pos in positions:
-                                        words[pos] = word
-                                abstract_text = " ".join([words[i] for i in sorted(words.keys())])
-                            else:
-                                abstract_text = ""
-                            
-                            # DOI
-                            doi = work.get("doi", "").replace("https://doi.org/", "")
-                            
-                            # Año
-                            year = str(work.get("publication_year", ""))
-                            
-                            # Journal
-                            journal = ""
-                            primary_location = work.get("primary_location", {})
-                            if primary_location:
-                                source = primary_location.get("source", {})
-                                journal = source.get("display_name", "")
-                            
-                            # URL
-                            url = work.get("id", "")
-                            
-                            if title:
-                                results.append({
-                                    "title": title,
-                                    "authors": authors,
-                                    "abstract": abstract_text,
-                                    "doi": doi,
-                                    "year": year,
-                                    "journal": journal,
-                                    "url": url,
-                                    "country": country,
-                                    "source": "OpenAlex"
-                                })
-                        except Exception as e:
-                            print(f"⚠️ Error procesando artículo: {e}")
-                            continue
-                else:
-                    print(f"⚠️ Error en API: {response.status}")
+        records = []
+        with stats.parsing():
+            feed = feedparser.parse(content)
+            for entry in feed.entries:
+                try:
+                    record = parse_arxiv_entry(entry)
+                except Exception as e:
+                    print(f"⚠️ Error procesando artículo: {e}")
+                    continue
+                if record:
+                    records.append(record)
         
-        df = pd.DataFrame(results)
-        path = os.path.join(DATA_DIR, "openalex.csv")
-        df.to_csv(path, index=False, encoding='utf-8')
-        print(f"✅ Guardado {len(df)} artículos de OpenAlex")
-        print(f"   📍 Artículos con país: {df['country'].notna().sum()}")
+        parsed = len(records)
+        if known is not None:
+            records = [r for r in records if not known.contains(r)]
         
-    except Exception as e:
-        print(f"⚠️ OpenAlex falló: {e}")
+        offset += window
+        yield offset, records
+        
+        # Sin más entradas: se alcanzó el final de los resultados
+        if len(feed.entries) < window:
+            break
+        if known is not None and parsed and not records:
+            break
 
-# ------------------ arXiv (API REST) ------------------
+@register_source
+class ArxivSource(SourceAdapter):
+    """
+    Nota: arXiv no proporciona información de país directamente
+    Cada ventana terminada se vuelca al disco y se anota en el checkpoint junto
+    con el archivo y las filas que tiene; con resume=True una descarga
+    interrumpida continúa desde el último offset completado, solo si el
+    archivo sigue teniendo esas filas (con resume=False no se lee ni se
+    escribe el checkpoint).
+    """
+    name = "arxiv"
+    label = "arXiv"
+    hosts = ("export.arxiv.org",)
+    concurrency = 1
+    
+    def __init__(self, resume=True):
+        self.resume = resume
+        self.start = 0
+        self.sort = {}
+        self.max_results = None
+        self.base_rows = 0  # filas que ya tenía el archivo al que se agrega
+    
+    def append_output(self, query, path, max_results=None, incremental=False):
+        self.sort = arxiv_sort_params(incremental)
+        self.max_results = max_results
+        self.start, self.base_rows = 0, 0
+        # ParquetSink no admite append: no hay archivo al que reanudar
+        if not self.resume or path.endswith(SINK_EXTENSIONS["parquet"]):
+            return False
+        checkpoint = load_arxiv_checkpoint(query, self.sort, max_results, path)
+        if checkpoint is not None and checkpoint.get("offset"):
+            rows = count_rows(path)
+            if rows == checkpoint.get("rows"):
+                print(f"↩️  Reanudando arXiv desde el offset {checkpoint['offset']}")
+                self.start, self.base_rows = int(checkpoint["offset"]), rows
+                return True
+            print(f"⚠️ El checkpoint de arXiv no coincide con {path} ({rows} filas, se esperaban "
+                  f"{checkpoint.get('rows')}): se descarga desde el inicio")
+        if incremental:
+            self.base_rows = count_rows(path)  # El sink agrega al archivo existente
+        return False
+    
+    async def iter_records(self, ctx, query, max_results):
+        async for offset, records in iter_arxiv_windows(ctx.session, query, max_results, self.start, cache=ctx.cache,
+                                                        limiter=ctx.limiter, known=ctx.known, stats=ctx.stats):
+            for record in records:
+                yield record
+            # La ventana queda en disco (en ctx.sink.path) antes de avanzar el checkpoint
+            if self.resume:
+                ctx.flush()
+                save_arxiv_checkpoint(query, offset, self.sort, self.max_results, ctx.sink.path,
+                                      self.base_rows + ctx.sink.count)
+    
+    def on_complete(self, query):
+        if self.resume:
+            clear_arxiv_checkpoint()
 
-async def scrape_arxiv(query, max_results=10):
+async def scrape_arxiv(query, max_results=10, resume=True, **options):
     """
     arXiv - API pública sin API key.
     http://arxiv.org/help/api/
-    Nota: arXiv no proporciona información de país directamente
+    options: session, cache, limiter, known, output_format (ver harvest_source).
     """
-    print("\n[arXiv] Extrayendo artículos vía API...")
-    
-    try:
-        base_url = "http://export.arxiv.org/api/query"
-        params = f"search_query=all:{quote_plus(query)}&start=0&max_results={max_results}"
-        url = f"{base_url}?{params}"
-        
-        results = []
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    feed = feedparser.parse(content)
-                    
-                    for entry in tqdm(feed.entries, desc="arXiv artículos"):
-                        try:
-                            title = entry.title.replace("\n", " ").strip()
-                            
-                            # Autores
-                            authors = ", ".join([author.name for author in entry.authors])
-                            
-                            # Intentar extraer afiliación de comentarios
-                            country = ""
-                            if hasattr(entry, 'arxiv_comment'):
-                                country = extract_country_from_text(entry.arxiv_comment)
-                            
-                            # Si no hay país, dejar vacío (arXiv no siempre tiene esta info)
-                            if not country:
-                                country = ""
-                            
-                            # Abstract
-                            abstract = entry.summary.replace("\n", " ").strip()
-                            
-                            # DOI
-                            doi = entry.get("arxiv_doi", "")
-                            
-                            # Año
-                            published = entry.published
-                            year = published.split("-")[0] if published else ""
-                            
-                            # Journal/Category
-                            categories = [tag.term for tag in entry.tags]
-                            journal = f"arXiv: {', '.join(categories[:2])}"
-                            
-                            # URL
-                            url = entry.id
-                            
-                            if title and abstract:
-                                results.append({
-                                    "title": title,
-                                    "authors": authors,
-                                    "abstract": abstract,
-                                    "doi": doi,
-                                    "year": year,
-                                    "journal": journal,
-                                    "url": url,
-                                    "country": country,
-                                    "source": "arXiv"
-                                })
-                        except Exception as e:
-                            print(f"⚠️ Error procesando artículo: {e}")
-                            continue
-                else:
-                    print(f"⚠️ Error en API: {response.status}")
-        
-        df = pd.DataFrame(results)
-        path = os.path.join(DATA_DIR, "arxiv.csv")
-        df.to_csv(path, index=False, encoding='utf-8')
-        print(f"✅ Guardado {len(df)} artículos de arXiv")
-        print(f"   📍 Artículos con país: {df['country'].notna().sum()}")
-        
-    except Exception as e:
-        print(f"⚠️ arXiv falló: {e}")
+    return await harvest_source(ArxivSource(resume=resume), query, max_results, **options)
 
 # ------------------ PubMed Central (API REST) ------------------
 
-async def scrape_pubmed(query, max_results=10):
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+PUBMED_BATCH_SIZE = 200
+ESEARCH_CACHE_TTL = 3600
+PARSE_WORKERS = 2  # Procesos dedicados a parsear el XML de efetch
+
+async def iter_pubmed(session, query, max_results=10, batch_size=PUBMED_BATCH_SIZE, cache=None, limiter=None, executor=None, known=None,
+                      stats=None):
     """
-    PubMed Central - API pública sin API key (E-utilities).
-    https://www.ncbi.nlm.nih.gov/books/NBK25501/
+    Generador asíncrono sobre PubMed Central (E-utilities).
+    Los detalles se piden por lotes: esearch guarda el resultado en el historial
+    del servidor (usehistory=y) y efetch lo recorre con WebEnv/query_key,
+    batch_size artículos por petición.
+    El XML de cada lote se parsea en un pool de procesos (o el executor recibido)
+    mientras se siguen descargando los lotes siguientes.
+    Con known los ids PMC ya descargados no se vuelven a pedir a efetch.
+    El tiempo de parseo se mide dentro del worker (telemetry.timed_call).
     """
-    print("\n[PubMed] Extrayendo artículos vía API...")
+    limiter = limiter or RateLimiter()
+    stats = stats or SourceStats("pubmed")
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
     
     try:
-        # Paso 1: Buscar IDs
-        search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+        # Paso 1: Buscar IDs (guardados en el historial de E-utilities)
+        search_url = f"{EUTILS_URL}/esearch.fcgi"
         params = {
             "db": "pmc",
             "term": query,
             "retmax": max_results,
             "retmode": "json",
+            "usehistory": "y",
             "tool": "bibliometria_app",
             "email": "research@example.com"
         }
         
-        results = []
-        async with aiohttp.ClientSession() as session:
-            # Obtener IDs
-            async with session.get(search_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    ids = data.get("esearchresult", {}).get("idlist", [])
-                    
-                    if not ids:
-                        print("⚠️ No se encontraron resultados")
-                        return
-                    
-                    print(f"📋 Encontrados {len(ids)} artículos")
-                    
-                    # Paso 2: Obtener detalles de cada artículo
-                    for pmid in tqdm(ids, desc="PubMed artículos"):
-                        try:
-                            fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-                            fetch_params = {
-                                "db": "pmc",
-                                "id": pmid,
-                                "retmode": "xml"
-                            }
-                            
-                            async with session.get(fetch_url, params=fetch_params) as fetch_response:
-                                if fetch_response.status == 200:
-                                    import xml.etree.ElementTree as ET
-                                    xml_text = await fetch_response.text()
-                                    root = ET.fromstring(xml_text)
-                                    
-                                    # Extraer campos
-                                    title = ""
-                                    title_elem = root.find(".//article-title")
-                                    if title_elem is not None:
-                                        title = "".join(title_elem.itertext()).strip()
-                                    
-                                    # Autores y país
-                                    authors_list = []
-                                    country = ""
-                                    
-                                    for contrib in root.findall(".//contrib[@contrib-type='author']"):
-                                        surname = contrib.find(".//surname")
-                                        given = contrib.find(".//given-names")
-                                        if surname is not None:
-                                            name = surname.text or ""
-                                            if given is not None and given.text:
-                                                name = f"{given.text} {name}"
-                                            authors_list.append(name)
-                                        
-                                        # Buscar afiliación del autor
-                                        if not country:
-                                            aff = contrib.find(".//aff")
-                                            if aff is not None:
-                                                aff_text = "".join(aff.itertext()).strip()
-                                                country = extract_country_from_text(aff_text)
-                                    
-                                    # Si no se encontró en autores, buscar en afiliaciones generales
-                                    if not country:
-                                        for aff in root.findall(".//aff"):
-                                            aff_text = "".join(aff.itertext()).strip()
-                                            country = extract_country_from_text(aff_text)
-                                            if country:
-                                                break
-                                    
-                                    authors = ", ".join(authors_list)
-                                    
-                                    # Abstract
-                                    abstract = ""
-                                    abstract_elem = root.find(".//abstract")
-                                    if abstract_elem is not None:
-                                        abstract = " ".join(abstract_elem.itertext()).strip()
-                                    
-                                    # DOI
-                                    doi = ""
-                                    doi_elem = root.find(".//article-id[@pub-id-type='doi']")
-                                    if doi_elem is not None:
-                                        doi = doi_elem.text or ""
-                                    
-                                    # Año
-                                    year = ""
-                                    year_elem = root.find(".//pub-date/year")
-                                    if year_elem is not None:
-                                        year = year_elem.text or ""
-                                    
-                                    # Journal
-                                    journal = ""
-                                    journal_elem = root.find(".//journal-title")
-                                    if journal_elem is not None:
-                                        journal = journal_elem.text or ""
-                                    
-                                    # URL
-                                    url = f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{pmid}/"
-                                    
-                                    if title:
-                                        results.append({
-                                            "title": title,
-                                            "authors": authors,
-                                            "abstract": abstract,
-                                            "doi": doi,
-                                            "year": year,
-                                            "journal": journal,
-                                            "url": url,
-                                            "country": country,
-                                            "source": "PubMed"
-                                        })
-                                
-                                await asyncio.sleep(0.4)  # Rate limit: 3 req/sec
-                                
-                        except Exception as e:
-                            print(f"⚠️ Error procesando artículo {pmid}: {e}")
-                            continue
-                else:
-                    print(f"⚠️ Error en búsqueda: {response.status}")
+        # El WebEnv del historial caduca, por eso esta respuesta se cachea poco tiempo
+        status, body = await fetch(session, search_url, params, cache, ttl=ESEARCH_CACHE_TTL, limiter=limiter, stats=stats)
+        if status != 200:
+            raise RuntimeError(f"Error en búsqueda: {status}")
+        data = json.loads(body)
         
-        df = pd.DataFrame(results)
-        path = os.path.join(DATA_DIR, "pubmed.csv")
-        df.to_csv(path, index=False, encoding='utf-8')
-        print(f"✅ Guardado {len(df)} artículos de PubMed")
-        print(f"   📍 Artículos con país: {df['country'].notna().sum()}")
+        search_result = data.get("esearchresult", {})
+        ids = search_result.get("idlist", [])
+        webenv = search_result.get("webenv", "")
+        query_key = search_result.get("querykey", "")
         
-    except Exception as e:
-        print(f"⚠️ PubMed falló: {e}")
-
-# ------------------ Helper para códigos de país ------------------
-
-def get_country_name_from_code(code):
-    """
-    Convierte código de país ISO a nombre completo.
-    """
-    country_codes = {
-        'US': 'United States',
-        'GB': 'United Kingdom',
-        'CN': 'China',
-        'DE': 'Germany',
-        'FR': 'France',
-        'JP': 'Japan',
-        'CA': 'Canada',
-        'AU': 'Australia',
-        'IN': 'India',
-        'BR': 'Brazil',
-        'ES': 'Spain',
-        'IT': 'Italy',
-        'NL': 'Netherlands',
-        'CH': 'Switzerland',
-        'KR': 'South Korea',
-        'SE': 'Sweden',
-        'RU': 'Russia',
-        'MX': 'Mexico',
-        'AR': 'Argentina',
-        'CO': 'Colombia',
-        'CL': 'Chile',
-        'PE': 'Peru',
-        'IL': 'Israel',
-        'ZA': 'South Africa',
-        'SG': 'Singapore',
-        'NZ': 'New Zealand',
-        'BE': 'Belgium',
-        'AT': 'Austria',
-        'PL': 'Poland',
-        'DK': 'Denmark',
-        'FI': 'Finland',
-        'NO': 'Norway',
-        'IE': 'Ireland',
-        'PT': 'Portugal',
-        'GR': 'Greece',
-        'TR': 'Turkey',
-        'IR': 'Iran',
-        'SA': 'Saudi Arabia',
-        'EG': 'Egypt',
-        'TW': 'Taiwan',
-        'TH': 'Thailand',
-        'MY': 'Malaysia',
-        'ID': 'Indonesia',
-        'PK': 'Pakistan',
-        'VN': 'Vietnam',
-        'CZ': 'Czech Republic',
-        'HU': 'Hungary',
-        'RO': 'Romania',
-        'UA': 'Ukraine'
-    }
+        if not ids:
+            print("⚠️ No se encontraron resultados")
+            return
+        
+        print(f"📋 Encontrados {len(ids)} artículos")
+        
+        if known is not None:
+            new_ids = [pmcid for pmcid in ids if not known.contains_pmcid(pmcid)]
+            print(f"🆕 Nuevos (no descargados antes): {len(new_ids)}")
+            if len(new_ids) < len(ids):
+                # El historial ya no coincide con la lista: pedir por ids
+                ids, webenv, query_key = new_ids, "", ""
+        
+        # Paso 2: Obtener detalles por lotes
+        fetch_url = f"{EUTILS_URL}/efetch.fcgi"
+        loop = asyncio.get_running_loop()
+        parsing = []  # (lote, futuro del parseo) en orden de descarga
+        
+        async def collect(start, future):
+            try:
+                records, seconds = await future
+                stats.record_parse(seconds)
+                return records
+            except Exception as e:
+                print(f"⚠️ Error procesando lote {start}: {e}")
+                return []
+        
+        for start in range(0, len(ids), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            fetch_params = {
+                "db": "pmc",
+                "retmode": "xml",
+                "tool": "bibliometria_app",
+                "email": "research@example.com"
+            }
+            if webenv and query_key:
+                fetch_params.update({
+                    "WebEnv": webenv,
+                    "query_key": query_key,
+                    "retstart": start,
+                    "retmax": len(batch_ids)
+                })
+            else:
+                fetch_params["id"] = ",".join(batch_ids)
+            
+            try:
+                status, xml_body = await fetch(session, fetch_url, fetch_params, cache, limiter=limiter, stats=stats)
+                if status == 200:
+                    future = loop.run_in_executor(executor, timed_call, parse_pmc_articleset, xml_body, batch_ids)
+                    parsing.append((start, future))
+                else:
+                    print(f"⚠️ Error en lote {start}: {status}")
+            except Exception as e:
+                print(f"⚠️ Error procesando lote {start}: {e}")
+            
+            # Acotar los lotes en vuelo: esperar el más antiguo si el pool está lleno
+            while len(parsing) > PARSE_WORKERS:
+                for record in await collect(*parsing.pop(0)):
+                    yield record
+        
+        for start, future in parsing:
+            for record in await collect(start, future):
+                yield record
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+@register_source
+class PubMedSource(SourceAdapter):
+    name = "pubmed"
+    label = "PubMed"
+    hosts = ("eutils.ncbi.nlm.nih.gov",)
+    concurrency = 1
+    
+    def __init__(self, batch_size=PUBMED_BATCH_SIZE, executor=None):
+        self.batch_size = batch_size
+        self.executor = executor
     
-    return country_codes.get(code.upper(), "")
+    async def iter_records(self, ctx, query, max_results):
+        async for record in iter_pubmed(ctx.session, query, max_results, self.batch_size, cache=ctx.cache,
+                                        limiter=ctx.limiter, executor=self.executor, known=ctx.known, stats=ctx.stats):
+            yield record
+
+async def scrape_pubmed(query, max_results=10, batch_size=PUBMED_BATCH_SIZE, executor=None, **options):
+    """
+    PubMed Central - API pública sin API key (E-utilities).
+    https://www.ncbi.nlm.nih.gov/books/NBK25501/
+    options: session, cache, limiter, known, output_format (ver harvest_source).
+    """
+    return await harvest_source(PubMedSource(batch_size, executor), query, max_results, **options)
 
 # ------------------ Controlador Principal ------------------
 
-async def run_all(query, sources, max_results=10, headless=False, use_persistent=True):
+async def cancel_tasks(tasks):
+    """Cancela las tareas pendientes y espera a que terminen de limpiar (sinks, executors)."""
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return pending
+
+async def run_all(query, sources, max_results=10, headless=False, use_persistent=True, concurrent=True, cache=None,
+                  incremental=False, output_format="csv", deadline=None, request_timeout=REQUEST_TIMEOUT, telemetry=None,
+                  rate_limits=None):
     """
     Ejecuta la descarga de artículos de las fuentes seleccionadas.
     Todas las fuentes usan APIs REST - No requiere Playwright.
+    Las fuentes se buscan en el registro (sources.SOURCES), así que cualquier
+    fuente registrada con @register_source se puede pedir por su nombre.
+    Con concurrent=True las fuentes corren en paralelo sobre una única sesión
+    HTTP compartida; cada fuente conserva su propio límite de peticiones.
+    cache (http_cache.ResponseCache) evita repetir peticiones ya respondidas.
+    Un único RateLimiter con un token bucket por host regula todas las fuentes,
+    con la concurrencia y los límites que declara cada una; rate_limits
+    ({host: (peticiones/segundo, ráfaga)}) agrega o reemplaza límites, p. ej.
+    para el servidor simulado de mock_server.
+    Con incremental=True se omiten los trabajos que ya están en data/download
+    (por DOI, id PMC o id arXiv) y solo se agregan los nuevos a cada CSV.
+    output_format elige el sink de cada fuente: 'csv' (el que usa merger.py),
+    'parquet' o 'sqlite'.
+    deadline (segundos) acota la descarga completa: al vencer se cancelan las
+    fuentes que sigan corriendo y se conserva lo que ya habían guardado
+    (en modo secuencial, las fuentes que no alcanzaron a empezar se omiten).
+    request_timeout acota cada petición HTTP individual.
+    Las métricas de cada fuente (telemetry.Telemetry, se crea una si no se
+    pasa) se imprimen al final y se exportan a data/download/telemetry.json.
+    Retorna {fuente: artículos guardados}.
     """
     print(f"\n🔍 Buscando: '{query}'")
     print(f"📚 Fuentes seleccionadas: {', '.join(sources)}")
     print(f"📊 Artículos por fuente: {max_results}")
+    if deadline:
+        print(f"⏱️ Tiempo límite: {deadline}s")
     
+    adapters = []
     for src in sources:
-        if src == "openalex":
-            await scrape_openalex(query, max_results)
-        elif src == "arxiv":
-            await scrape_arxiv(query, max_results)
-        elif src == "pubmed":
-            await scrape_pubmed(query, max_results)
+        adapter = get_source(src)
+        if adapter is not None:
+            adapters.append(adapter)
         else:
             print(f"⚠️ Fuente desconocida: {src}")
+    
+    limiter = RateLimiter(rate_limits)
+    for adapter in adapters:
+        adapter.configure_limiter(limiter)
+    known = KnownWorks.from_dir(DATA_DIR) if incremental else None
+    telemetry = telemetry or Telemetry()
+    
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline if deadline else None
+    
+    def remaining():
+        return None if ends_at is None else max(0.0, ends_at - loop.time())
+    
+    tasks = {}
+    async with create_session(request_timeout=request_timeout) as session:
+        def start(adapter):
+            task = asyncio.create_task(harvest_source(adapter, query, max_results, session=session, cache=cache,
+                                                      limiter=limiter, known=known, output_format=output_format,
+                                                      stats=telemetry.source(adapter.name)))
+            tasks[task] = adapter.name
+            return task
+        
+        try:
+            if concurrent:
+                for adapter in adapters:
+                    start(adapter)
+                if tasks:
+                    await asyncio.wait(tasks, timeout=remaining())
+            else:
+                for adapter in adapters:
+                    if remaining() == 0:
+                        print(f"⏭️ {adapter.label} omitida: se agotó el tiempo límite")
+                        continue
+                    await asyncio.wait({start(adapter)}, timeout=remaining())
+        finally:
+            # Al vencer el plazo (o si se cancela run_all) se detienen las fuentes en curso
+            stopped = await cancel_tasks(tasks)
+            if stopped and remaining() == 0:
+                print(f"\n⏱️ Tiempo límite alcanzado: {len(stopped)} fuente(s) detenida(s)")
+    
+    telemetry.print_summary()
+    print(f"📁 Métricas en {telemetry.export_json(os.path.join(DATA_DIR, TELEMETRY_FILE))}")
+    
+    return {
+        name: task.result() if not task.cancelled() and task.exception() is None else 0
+        for task, name in tasks.items()
+    }
 
-# ------------------ Fin del Módulo ------------------
\ No newline at end of file
+# ------------------ Fin del Módulo ------------------
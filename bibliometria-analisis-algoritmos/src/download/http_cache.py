@@ -0,0 +1,115 @@
+# src/download/http_cache.py
+"""
+Caché en disco de respuestas HTTP para el downloader.
+- Clave: hash SHA-256 de la URL + parámetros (ordenados)
+- Expiración por TTL (segundos desde que se guardó la respuesta)
+- Tamaño máximo con desalojo LRU (el mtime del archivo marca el último acceso)
+- Modo replay: sirve todo desde la caché sin tocar la red
+Estructura en data/download/.cache:
+  <clave>.body -> cuerpo de la respuesta (bytes)
+  <clave>.json -> metadatos (url, params, fecha de guardado, tamaño)
+"""
+import os
+import json
+import time
+import hashlib
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CACHE_DIR = os.path.join(BASE_DIR, "data/download/.cache")
+
+DEFAULT_TTL = 24 * 3600               # 1 día
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+class CacheMiss(Exception):
+    """La respuesta no está en caché y el modo replay impide ir a la red."""
+
+
+class ResponseCache:
+    """Caché de respuestas direccionada por contenido de la petición."""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, replay=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(
+            os.path.getsize(os.path.join(cache_dir, f))
+            for f in os.listdir(cache_dir) if f.endswith(".body")
+        )
+
+    @staticmethod
+    def make_key(url, params=None):
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([url, items], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def get(self, url, params=None, ttl=None):
+        """
+        Retorna el cuerpo guardado o None si no existe o expiró.
+        En modo replay se ignora la expiración.
+        """
+        body_path, meta_path = self._paths(self.make_key(url, params))
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        ttl = self.ttl if ttl is None else ttl
+        if not self.replay and ttl is not None and time.time() - meta.get("stored_at", 0) > ttl:
+            self._remove(body_path, meta_path)
+            return None
+
+        os.utime(body_path)  # marcar como usado recientemente (LRU)
+        return body
+
+    def set(self, url, params, body):
+        """Guarda el cuerpo de una respuesta y aplica el límite de tamaño."""
+        body_path, meta_path = self._paths(self.make_key(url, params))
+        if os.path.exists(body_path):
+            self._size -= os.path.getsize(body_path)
+        with open(body_path, "wb") as f:
+            f.write(body)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "params": {str(k): str(v) for k, v in (params or {}).items()},
+                "stored_at": time.time(),
+                "size": len(body)
+            }, f)
+        self._size += len(body)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Elimina las entradas menos usadas hasta quedar bajo max_bytes."""
+        entries = []
+        for f in os.listdir(self.cache_dir):
+            if f.endswith(".body"):
+                path = os.path.join(self.cache_dir, f)
+                entries.append((os.path.getmtime(path), path))
+        for _, body_path in sorted(entries):
+            if self._size <= self.max_bytes:
+                break
+            self._remove(body_path, body_path[:-len(".body")] + ".json")
+
+    def clear(self):
+        for f in os.listdir(self.cache_dir):
+            if f.endswith(".body"):
+                body_path = os.path.join(self.cache_dir, f)
+                self._remove(body_path, body_path[:-len(".body")] + ".json")
+
+    def _remove(self, body_path, meta_path):
+        if os.path.exists(body_path):
+            self._size -= os.path.getsize(body_path)
+            os.remove(body_path)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
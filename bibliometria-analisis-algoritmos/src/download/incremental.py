@@ -0,0 +1,81 @@
+# src/download/incremental.py
+"""
+Índice de trabajos ya descargados para las descargas incrementales.
+Cada registro se identifica por todas las claves que tenga disponibles:
+  doi:<doi normalizado>, arxiv:<id sin versión>, pmc:<id>, openalex:<W...>
+Un registro se considera conocido si cualquiera de sus claves ya está en el índice.
+"""
+import os
+import re
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data/download")
+
+ARXIV_ID = re.compile(r"arxiv\.org/abs/([^\s?#]+?)(?:v\d+)?/?$", re.IGNORECASE)
+PMC_ID = re.compile(r"/pmc/articles/PMC(\d+)", re.IGNORECASE)
+OPENALEX_ID = re.compile(r"openalex\.org/(W\d+)", re.IGNORECASE)
+
+
+def normalize_doi(doi):
+    if not isinstance(doi, str):
+        return ""
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi
+
+
+def work_keys(doi="", url=""):
+    """Claves de identidad de un trabajo a partir de su DOI y su URL."""
+    keys = []
+    doi = normalize_doi(doi)
+    if doi:
+        keys.append(f"doi:{doi}")
+    if isinstance(url, str) and url:
+        for prefix, pattern in (("arxiv", ARXIV_ID), ("pmc", PMC_ID), ("openalex", OPENALEX_ID)):
+            match = pattern.search(url)
+            if match:
+                keys.append(f"{prefix}:{match.group(1)}")
+    return keys
+
+
+class KnownWorks:
+    """Conjunto de claves de los trabajos ya presentes en el almacén local."""
+
+    def __init__(self, keys=None):
+        self.keys = set(keys or [])
+
+    @classmethod
+    def from_dir(cls, data_dir=DATA_DIR):
+        """Construye el índice leyendo solo las columnas doi/url de los CSV existentes."""
+        known = cls()
+        if not os.path.isdir(data_dir):
+            return known
+        for f in os.listdir(data_dir):
+            if not f.endswith(".csv"):
+                continue
+            try:
+                df = pd.read_csv(os.path.join(data_dir, f), usecols=lambda c: c in ("doi", "url"), dtype=str)
+            except Exception as e:
+                print(f"⚠️ No pudo indexar {f}: {e}")
+                continue
+            dois = df["doi"] if "doi" in df.columns else [""] * len(df)
+            urls = df["url"] if "url" in df.columns else [""] * len(df)
+            for doi, url in zip(dois, urls):
+                known.keys.update(work_keys(doi, url))
+        print(f"📇 Índice incremental: {len(known.keys)} claves conocidas")
+        return known
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, record):
+        return any(k in self.keys for k in work_keys(record.get("doi"), record.get("url")))
+
+    def contains_pmcid(self, pmcid):
+        return f"pmc:{pmcid}" in self.keys
+
+    def add(self, record):
+        self.keys.update(work_keys(record.get("doi"), record.get("url")))
@@ -1,41 +1,467 @@
 # src/download/merger.py
 """
 Unifica los CSV en data/ y deduplica:
-- primero: por DOI (si existe)
-- luego: por título normalizado (minúsculas, quitar puntuación/espacios extras)
+- primero: por DOI normalizado (sin prefijos doi.org / doi:, minúsculas)
+- luego: por título normalizado (minúsculas, quitar puntuación/espacios extras),
+  solo si los DOI no se contradicen (alguno de los dos registros no tiene DOI)
 Genera:
-  - data/unified.csv   -> registros únicos
-  - data/duplicates.csv -> registros eliminados como duplicados
+  - data/unified.csv   -> registros únicos, cada uno con su record_id
+  - data/duplicates.csv -> registros eliminados como duplicados, con el
+                           record_id en el que se fusionaron (duplicate_of)
+                           y la clave que coincidió (match: doi / title / near)
+  - data/unified.parquet -> los mismos registros en el almacén columnar
+                           tipado que leen las demás etapas (unified_store.py)
+Opcionalmente (near_duplicates=True) una tercera etapa fusiona casi-duplicados
+de título + abstract con MinHash-LSH (ver near_duplicates.py).
+La unión es en streaming: cada CSV se lee por bloques, DOI y títulos se
+normalizan con operaciones vectorizadas de pandas y solo se guardan en memoria
+los índices hash (uint64) -> record_id; los registros se escriben a los
+archivos de salida bloque a bloque.
 """
 import os, pandas as pd, re
+import json
+import hashlib
+import numpy as np
+from src.download.near_duplicates import NEAR_DUP_THRESHOLD, NUM_PERM, MinHasher, find_near_duplicates, shingle_hashes
+from src.download.unified_store import UNIFIED_FILE, update_unified_store
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data/download")
 
+MERGE_CHUNK_SIZE = 50_000
+DUPLICATES_FILE = "duplicates.csv"
+# Archivos generados por el merger (no son fuentes)
+OUTPUT_FILES = {UNIFIED_FILE, DUPLICATES_FILE}
+
+# Estado de la unión incremental
+MANIFEST_FILE = ".merge_manifest.json"
+INDEX_FILE = ".merge_index.npz"
+MANIFEST_VERSION = 1
+
+DOI_PREFIX = r"^(?:https?://(?:dx\.)?doi\.org/|doi:)"
+
 def normalize_title(t):
     if pd.isna(t): return ""
     t = re.sub(r"[^\w\s]", "", str(t).lower().strip())
     return re.sub(r"\s+", " ", t)
 
-def merge_and_deduplicate(data_dir=DATA_DIR):
-    files = [f for f in os.listdir(data_dir) if f.endswith(".csv")]
-    all_rows = []
+def normalize_titles(titles):
+    """Versión vectorizada de normalize_title sobre una Serie."""
+    return (titles.fillna("").astype(str).str.lower().str.strip()
+            .str.replace(r"[^\w\s]", "", regex=True)
+            .str.replace(r"\s+", " ", regex=True))
+
+def normalize_dois(dois):
+    """DOI en minúsculas y sin prefijos de resolución (vectorizado; '' si no hay)."""
+    return dois.fillna("").astype(str).str.strip().str.lower().str.replace(DOI_PREFIX, "", regex=True)
+
+def key_hashes(values):
+    """Hash uint64 de cada valor (None donde el valor está vacío)."""
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy().tolist()
+    return [h if v else None for h, v in zip(hashes, values.to_numpy().tolist())]
+
+def merge_columns(paths):
+    """Columnas de salida: la unión de las cabeceras en orden de aparición (+ source_file, title_norm y record_id)."""
+    columns = []
+    for path in paths:
+        for c in pd.read_csv(path, nrows=0).columns:
+            if c not in columns:
+                columns.append(c)
+    for c in ("source_file", "title_norm", "record_id"):
+        if c not in columns:
+            columns.append(c)
+    return columns
+
+def iter_chunks(path, chunk_size=MERGE_CHUNK_SIZE, offset=0):
+    """
+    Bloques de un CSV como texto (sin inferir tipos, que varían entre bloques).
+    Con offset se empieza a leer en ese byte (filas agregadas después de una unión anterior).
+    """
+    if not offset:
+        yield from pd.read_csv(path, dtype=str, chunksize=chunk_size)
+        return
+    names = list(pd.read_csv(path, nrows=0).columns)
+    with open(path, encoding="utf-8", newline="") as f:
+        f.seek(offset)
+        yield from pd.read_csv(f, dtype=str, chunksize=chunk_size, header=None, names=names)
+
+class DedupIndex:
+    """
+    Índices hash de DOI y de título -> record_id de los registros conservados.
+    Un registro es duplicado si su DOI ya está indexado o, si no, si su título
+    ya está indexado y alguno de los dos no tiene DOI.
+    """
+
+    def __init__(self):
+        self.by_doi = {}
+        self.by_title = {}  # hash del título -> (record_id, tiene DOI)
+        self.next_id = 0
+
+    def assign(self, doi_keys, title_keys):
+        """
+        Clasifica un bloque. Retorna (record_ids, duplicate_of, matches): para
+        cada fila su record_id nuevo o None, el record_id en que se fusiona o
+        None y la clave que coincidió ('doi', 'title' o '').
+        """
+        record_ids, duplicate_of, matches = [], [], []
+        for doi, title in zip(doi_keys, title_keys):
+            target, match = None, ""
+            if doi is not None and doi in self.by_doi:
+                target, match = self.by_doi[doi], "doi"
+            elif title is not None and title in self.by_title:
+                kept_id, kept_has_doi = self.by_title[title]
+                if doi is None or not kept_has_doi:
+                    target, match = kept_id, "title"
+                    if doi is not None:
+                        # El registro conservado hereda el DOI del duplicado
+                        self.by_doi[doi] = kept_id
+                        self.by_title[title] = (kept_id, True)
+
+            if target is None:
+                target = self.next_id
+                self.next_id += 1
+                if doi is not None:
+                    self.by_doi[doi] = target
+                if title is not None:
+                    self.by_title.setdefault(title, (target, doi is not None))
+                record_ids.append(target)
+                duplicate_of.append(None)
+            else:
+                record_ids.append(None)
+                duplicate_of.append(target)
+            matches.append(match)
+        return record_ids, duplicate_of, matches
+
+    def snapshot(self):
+        """Copia del estado del índice (para deshacer un shard que falló)."""
+        return dict(self.by_doi), dict(self.by_title), self.next_id
+
+    def restore(self, state):
+        self.by_doi, self.by_title, self.next_id = state
+
+    def save(self, path):
+        """Guarda el índice en un .npz (claves uint64 y record_ids)."""
+        titles = list(self.by_title.items())
+        with open(path + ".tmp", "wb") as f:
+            np.savez(
+                f,
+                doi_keys=np.fromiter(self.by_doi.keys(), dtype=np.uint64, count=len(self.by_doi)),
+                doi_ids=np.fromiter(self.by_doi.values(), dtype=np.int64, count=len(self.by_doi)),
+                title_keys=np.array([k for k, _ in titles], dtype=np.uint64),
+                title_ids=np.array([v[0] for _, v in titles], dtype=np.int64),
+                title_has_doi=np.array([v[1] for _, v in titles], dtype=bool),
+                next_id=np.array(self.next_id)
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with np.load(path) as data:
+            index.by_doi = dict(zip(data["doi_keys"].tolist(), data["doi_ids"].tolist()))
+            index.by_title = dict(zip(data["title_keys"].tolist(),
+                                      zip(data["title_ids"].tolist(), data["title_has_doi"].tolist())))
+            index.next_id = int(data["next_id"])
+        return index
+
+def write_chunk(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+def near_duplicate_texts(chunk):
+    """Título + abstract normalizados de cada fila."""
+    title = chunk["title"] if "title" in chunk else pd.Series("", index=chunk.index)
+    abstract = chunk["abstract"] if "abstract" in chunk else pd.Series("", index=chunk.index)
+    return normalize_titles(title.fillna("") + " " + abstract.fillna(""))
+
+def fold_near_duplicates(unified_path, duplicates_path, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM,
+                         chunk_size=MERGE_CHUNK_SIZE):
+    """
+    Etapa de casi-duplicados sobre un unified ya deduplicado por DOI/título.
+    Primera pasada: firmas MinHash por bloques. Luego LSH + Jaccard exacto;
+    dos registros con DOI distintos nunca se fusionan.
+    Segunda pasada: reescribe unified sin los casi-duplicados y los agrega al
+    registro de duplicados (match = 'near', duplicate_of = record_id conservado).
+    Retorna la cantidad de registros fusionados.
+    """
+    hasher = MinHasher(num_perm)
+    record_ids, dois, shingle_sets, signatures = [], [], [], []
+    for chunk in iter_chunks(unified_path, chunk_size):
+        shingles = shingle_hashes(near_duplicate_texts(chunk).tolist())
+        record_ids.extend(chunk["record_id"].astype(int).tolist())
+        dois.extend(normalize_dois(chunk["doi"]).tolist() if "doi" in chunk else [""] * len(chunk))
+        shingle_sets.extend(shingles)
+        signatures.append(hasher.signatures(shingles))
+    if not record_ids:
+        return 0
+
+    folded = find_near_duplicates(shingle_sets, np.vstack(signatures), threshold, dois)
+    del shingle_sets, signatures, dois
+    if not folded:
+        return 0
+    duplicate_of = {record_ids[doc]: record_ids[root] for doc, (root, _) in folded.items()}
+
+    dup_columns = pd.read_csv(duplicates_path, nrows=0).columns
+    tmp = unified_path + ".near"
+    first = True
+    for chunk in iter_chunks(unified_path, chunk_size):
+        ids = chunk["record_id"].astype(int)
+        is_dup = ids.isin(duplicate_of).to_numpy()
+        write_chunk(chunk.loc[~is_dup], tmp, first)
+        first = False
+        if is_dup.any():
+            dups = chunk.loc[is_dup].drop(columns="record_id")
+            dups["duplicate_of"] = ids[is_dup].map(duplicate_of)
+            dups["match"] = "near"
+            write_chunk(dups.reindex(columns=dup_columns), duplicates_path, False)
+    os.replace(tmp, unified_path)
+    return len(duplicate_of)
+
+# ------------------ Manifest (unión incremental) ------------------
+
+def file_fingerprint(path, prefix_size=None):
+    """
+    (blake2b del archivo, blake2b de sus primeros prefix_size bytes o None).
+    El hash del prefijo permite reconocer un CSV al que solo se le agregaron filas.
+    """
+    full, prefix = hashlib.blake2b(digest_size=16), hashlib.blake2b(digest_size=16)
+    prefix_digest = None
+    read = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            full.update(block)
+            if prefix_size is not None and read < prefix_size:
+                prefix.update(block[:prefix_size - read])
+            read += len(block)
+            if prefix_size is not None and prefix_digest is None and read >= prefix_size:
+                prefix_digest = prefix.hexdigest()
+    return full.hexdigest(), prefix_digest
+
+def load_manifest(data_dir):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if manifest.get("version") == MANIFEST_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(data_dir, manifest):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def plan_incremental(data_dir, paths, manifest):
+    """
+    Compara los CSV con el manifest. Retorna (shards, fingerprints) donde shards
+    es la lista [(archivo, filas ya unidas, byte donde empieza lo nuevo)], o None
+    si hace falta reconstruir todo (un archivo se reescribió o desapareció).
+    """
+    known = manifest["files"]
+    if set(known) - set(paths):
+        return None, None
+    shards, fingerprints = [], {}
+    for f in paths:
+        stat = os.stat(os.path.join(data_dir, f))
+        entry = known.get(f)
+        current = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if entry and entry["size"] == current["size"] and entry["mtime_ns"] == current["mtime_ns"]:
+            fingerprints[f] = entry
+            continue
+        digest, prefix_digest = file_fingerprint(os.path.join(data_dir, f), entry["size"] if entry else None)
+        current["sha"] = digest
+        if entry is None:
+            shards.append((f, 0, 0))
+        elif digest == entry["sha"]:
+            current["rows"] = entry["rows"]  # Solo cambió la fecha
+        elif current["size"] > entry["size"] and prefix_digest == entry["sha"]:
+            shards.append((f, entry["rows"], entry["size"]))  # Filas agregadas al final
+        else:
+            return None, None
+        fingerprints[f] = {**entry, **current} if entry else current
+    return shards, fingerprints
+
+def can_append(data_dir, manifest, columns, index_path):
+    """La salida anterior sigue intacta y admite las columnas nuevas."""
+    out = os.path.join(data_dir, UNIFIED_FILE)
+    dup_out = os.path.join(data_dir, DUPLICATES_FILE)
+    if not all(os.path.exists(p) for p in (out, dup_out, index_path)):
+        return False
+    if os.path.getsize(out) != manifest["unified_size"] or os.path.getsize(dup_out) != manifest["duplicates_size"]:
+        return False
+    return set(columns) <= set(manifest["columns"])
+
+# ------------------ Unión ------------------
+
+def merge_shards(data_dir, shards, index, columns, dup_columns, out, dup_out, append, chunk_size):
+    """
+    Pasa los shards [(archivo, filas ya unidas, byte inicial)] por el índice de deduplicación y
+    escribe los únicos en out y los duplicados en dup_out (agregando si append).
+    Cada shard es atómico: si falla a mitad, out y dup_out se truncan al tamaño
+    que tenían antes del shard y el índice vuelve a su copia previa, así sus
+    filas no quedan a medias en la salida ni en el índice.
+    Retorna ({'doi': n, 'title': n}, {archivo: filas leídas}).
+    """
+    written = {"unified": append, "duplicates": append}
+    by_match = {"doi": 0, "title": 0}
+    rows = {}
+    for f, done, offset in shards:
+        rows[f] = done
+        saved = (dict(written), dict(by_match), index.snapshot(),
+                 {p: os.path.getsize(p) if os.path.exists(p) else 0 for p in (out, dup_out)})
+        try:
+            for chunk in iter_chunks(os.path.join(data_dir, f), chunk_size, offset):
+                rows[f] += len(chunk)
+                chunk["source_file"] = f
+                empty = pd.Series("", index=chunk.index)
+                chunk["title_norm"] = normalize_titles(chunk["title"] if "title" in chunk else empty)
+                dois = normalize_dois(chunk["doi"] if "doi" in chunk else empty)
+                record_ids, duplicate_of, matches = index.assign(key_hashes(dois), key_hashes(chunk["title_norm"]))
+                
+                chunk["record_id"] = pd.array(record_ids, dtype="Int64")
+                kept = chunk["record_id"].notna().to_numpy()
+                write_chunk(chunk.loc[kept].reindex(columns=columns), out, not written["unified"])
+                written["unified"] = True
+                
+                if not kept.all():
+                    dups = chunk.loc[~kept].drop(columns="record_id")
+                    dups["duplicate_of"] = pd.array(duplicate_of, dtype="Int64")[~kept]
+                    dups["match"] = pd.Series(matches, index=chunk.index)[~kept]
+                    for match, count in dups["match"].value_counts().items():
+                        by_match[match] += count
+                    write_chunk(dups.reindex(columns=dup_columns), dup_out, not written["duplicates"])
+                    written["duplicates"] = True
+        except Exception as e:
+            print(f"No pudo leer {f}: {e}")
+            rows.pop(f)
+            written, by_match, index_state, sizes = saved
+            index.restore(index_state)
+            for path, size in sizes.items():
+                if os.path.exists(path):
+                    os.truncate(path, size)
+    if not written["duplicates"]:
+        pd.DataFrame(columns=dup_columns).to_csv(dup_out, index=False)
+    return by_match, rows
+
+def merge_and_deduplicate(data_dir=DATA_DIR, chunk_size=MERGE_CHUNK_SIZE, near_duplicates=False,
+                          near_threshold=NEAR_DUP_THRESHOLD, rebuild=False):
+    """
+    Une y deduplica los CSV de data_dir (ver el docstring del módulo).
+    Con near_duplicates=True agrega la etapa MinHash-LSH con umbral de Jaccard
+    near_threshold. Retorna la cantidad de registros únicos.
+    La unión es incremental: .merge_manifest.json guarda tamaño, fecha y hash
+    de cada CSV ya unido y .merge_index.npz el índice de claves. Los CSV nuevos
+    o con filas agregadas al final se procesan contra ese índice y se agregan a
+    unified.csv / duplicates.csv; si no cambió nada no se lee ningún CSV.
+    Se reconstruye todo si un CSV se reescribió o se borró, si la salida
+    anterior no coincide con el manifest, con near_duplicates=True (la etapa
+    compara todos los registros entre sí) o con rebuild=True.
+    """
+    files = sorted(f for f in os.listdir(data_dir) if f.endswith(".csv") and f not in OUTPUT_FILES)
+    paths = []
     for f in files:
         try:
-            df = pd.read_csv(os.path.join(data_dir, f))
-            if df.empty or len(df.columns) < 2:
+            header = pd.read_csv(os.path.join(data_dir, f), nrows=0)
+            if len(header.columns) < 2:
                 print(f"⚠️ Ignorando CSV vacío: {f}")
                 continue
-            df["source_file"] = f
-            all_rows.append(df)
+            paths.append(f)
         except Exception as e:
             print(f"No pudo leer {f}: {e}")
-    if not all_rows:
+    if not paths:
         print("⚠️ No hay datos válidos para unir.")
-        return
-    df = pd.concat(all_rows, ignore_index=True)
-    df["title_norm"] = df["title"].apply(normalize_title)
-    df.drop_duplicates(subset=["doi", "title_norm"], inplace=True)
-    out = os.path.join(data_dir, "unified.csv")
-    df.to_csv(out, index=False)
-    print(f"✅ Unificados {len(df)} artículos -> {out}")
+        return 0
+
+    out = os.path.join(data_dir, UNIFIED_FILE)
+    dup_out = os.path.join(data_dir, DUPLICATES_FILE)
+    index_path = os.path.join(data_dir, INDEX_FILE)
+    manifest = None if (rebuild or near_duplicates) else load_manifest(data_dir)
+    
+    if manifest is not None:
+        shards, fingerprints = plan_incremental(data_dir, paths, manifest)
+        if shards is not None and not shards and can_append(data_dir, manifest, [], index_path):
+            manifest["files"] = fingerprints
+            save_manifest(data_dir, manifest)
+            update_unified_store(out)
+            print(f"✅ Sin cambios: {manifest['records']} artículos en {out}")
+            return manifest["records"]
+        columns = merge_columns([os.path.join(data_dir, f) for f, _, _ in shards]) if shards else []
+        if shards is not None and can_append(data_dir, manifest, columns, index_path):
+            columns = manifest["columns"]
+            dup_columns = [c for c in columns if c != "record_id"] + ["duplicate_of", "match"]
+            index = DedupIndex.load(index_path)
+            start_id = index.next_id
+            by_match, rows = merge_shards(data_dir, shards, index, columns, dup_columns, out, dup_out, True, chunk_size)
+            for f, _, _ in shards:
+                if f in rows:
+                    fingerprints[f]["rows"] = rows[f]
+                elif f in manifest["files"]:
+                    fingerprints[f] = manifest["files"][f]  # Falló: se reintenta en la próxima unión
+                else:
+                    fingerprints.pop(f)
+            added = index.next_id - start_id
+            index.save(index_path)
+            manifest.update({
+                "files": fingerprints,
+                "records": manifest["records"] + added,
+                "unified_size": os.path.getsize(out),
+                "duplicates_size": os.path.getsize(dup_out)
+            })
+            save_manifest(data_dir, manifest)
+            update_unified_store(out, append=True)
+            print(f"✅ Unión incremental ({len(shards)} archivo(s) nuevos o ampliados): "
+                  f"+{added} artículos, {manifest['records']} en {out}")
+            print(f"   ♻️ Duplicados nuevos: {by_match['doi']} por DOI, {by_match['title']} por título -> {dup_out}")
+            return manifest["records"]
+        print("🔄 Reconstruyendo la unión completa")
+
+    columns = merge_columns([os.path.join(data_dir, f) for f in paths])
+    dup_columns = [c for c in columns if c != "record_id"] + ["duplicate_of", "match"]
+    # Se escribe en temporales y se reemplaza al final (una unión fallida no pisa la anterior)
+    tmp, dup_tmp = out + ".tmp", dup_out + ".tmp"
+    index = DedupIndex()
+    try:
+        by_match, rows = merge_shards(data_dir, [(f, 0, 0) for f in paths], index, columns, dup_columns,
+                                      tmp, dup_tmp, False, chunk_size)
+        if not index.next_id:
+            print("⚠️ No hay datos válidos para unir.")
+            return 0
+        near = 0
+        if near_duplicates:
+            near = fold_near_duplicates(tmp, dup_tmp, near_threshold, chunk_size=chunk_size)
+        os.replace(tmp, out)
+        os.replace(dup_tmp, dup_out)
+    finally:
+        for path in (tmp, dup_tmp, tmp + ".near"):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    records = index.next_id - near
+    if near_duplicates:
+        # Los casi-duplicados no se mantienen incrementalmente: la próxima unión reconstruye
+        for path in (index_path, os.path.join(data_dir, MANIFEST_FILE)):
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        index.save(index_path)
+        fingerprints = {}
+        for f, n in rows.items():
+            stat = os.stat(os.path.join(data_dir, f))
+            fingerprints[f] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                               "sha": file_fingerprint(os.path.join(data_dir, f))[0], "rows": n}
+        save_manifest(data_dir, {
+            "version": MANIFEST_VERSION,
+            "files": fingerprints,
+            "columns": columns,
+            "records": records,
+            "unified_size": os.path.getsize(out),
+            "duplicates_size": os.path.getsize(dup_out)
+        })
+    update_unified_store(out)
+    print(f"✅ Unificados {records} artículos -> {out}")
+    print(f"   ♻️ Duplicados: {by_match['doi']} por DOI, {by_match['title']} por título"
+          + (f", {near} casi-duplicados (Jaccard >= {near_threshold})" if near_duplicates else "")
+          + f" -> {dup_out}")
+    return records
@@ -0,0 +1,251 @@
+# src/download/mock_server.py
+"""
+Servidor aiohttp local que imita las APIs usadas por el downloader, para
+medir y probar la descarga sin conexión:
+- /openalex/works              JSON de OpenAlex con paginación por cursor
+- /arxiv/api/query             feed Atom de arXiv (start / max_results)
+- /eutils/esearch.fcgi         búsqueda de E-utilities (JSON, usehistory)
+- /eutils/efetch.fcgi          <pmc-articleset> JATS por WebEnv/retstart o por ids
+Los registros son sintéticos y deterministas (el registro i siempre es el mismo).
+MockApiConfig controla cuántos registros hay, la latencia por petición y la
+fracción de respuestas 503 (con Retry-After: 0) para ejercitar los reintentos.
+Uso: python src/download/mock_server.py [--port 8765] [--records 10000] [--latency 0.05] [--error-rate 0.01]
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from xml.sax.saxutils import escape
+from aiohttp import web
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+DEFAULT_PORT = 8765
+
+VOCABULARY = (
+    "algorithm analysis graph network learning model data bibliometric citation "
+    "sorting complexity search optimization neural semantic similarity cluster"
+).split()
+
+COUNTRIES = [("CO", "Colombia"), ("US", "United States"), ("ES", "Spain"), ("BR", "Brazil"), ("DE", "Germany")]
+
+
+class MockApiConfig:
+    """Parámetros del servidor simulado."""
+
+    def __init__(self, records=10000, latency=0.0, error_rate=0.0, abstract_words=120, seed=0):
+        self.records = records
+        self.latency = latency
+        self.error_rate = error_rate
+        self.abstract_words = abstract_words
+        self.random = random.Random(seed)
+
+
+# ------------------ Registros sintéticos ------------------
+
+def synthetic_work(i, abstract_words=120):
+    """Campos comunes del registro sintético i."""
+    rng = random.Random(i)
+    code, country = COUNTRIES[i % len(COUNTRIES)]
+    return {
+        "title": f"Synthetic article {i}: {' '.join(rng.choices(VOCABULARY, k=6))}",
+        "authors": [f"Author{i}-{k} Surname{k}" for k in range(1 + i % 4)],
+        "abstract": rng.choices(VOCABULARY, k=abstract_words),
+        "doi": f"10.5555/mock.{i}",
+        "year": 2000 + i % 25,
+        "journal": f"Journal of Mock Studies {i % 50}",
+        "country_code": code,
+        "country": country
+    }
+
+
+def openalex_work(i, abstract_words=120):
+    work = synthetic_work(i, abstract_words)
+    inverted = {}
+    for pos, word in enumerate(work["abstract"]):
+        inverted.setdefault(word, []).append(pos)
+    return {
+        "id": f"https://openalex.org/W{i}",
+        "doi": f"https://doi.org/{work['doi']}",
+        "title": work["title"],
+        "publication_year": work["year"],
+        "authorships": [
+            {
+                "author": {"display_name": name},
+                "institutions": [{"display_name": f"University of {work['country']}", "country_code": work["country_code"]}]
+            }
+            for name in work["authors"]
+        ],
+        "abstract_inverted_index": inverted,
+        "primary_location": {"source": {"display_name": work["journal"]}}
+    }
+
+
+def arxiv_entry(i, abstract_words=120):
+    work = synthetic_work(i, abstract_words)
+    authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in work["authors"])
+    return (
+        "<entry>"
+        f"<id>http://arxiv.org/abs/{2000 + i // 100000}.{i % 100000:05d}v1</id>"
+        f"<published>{work['year']}-01-01T00:00:00Z</published>"
+        f"<title>{escape(work['title'])}</title>"
+        f"<summary>{escape(' '.join(work['abstract']))}</summary>"
+        f"{authors}"
+        f"<arxiv:doi>{work['doi']}</arxiv:doi>"
+        f"<arxiv:comment>Department of Computing, {work['country']}</arxiv:comment>"
+        '<category term="cs.DS" scheme="http://arxiv.org/schemas/atom"/>'
+        "</entry>"
+    )
+
+
+def pmc_article(i, abstract_words=120):
+    work = synthetic_work(i, abstract_words)
+    contribs = "".join(
+        f'<contrib contrib-type="author"><name><surname>{escape(name.split()[1])}</surname>'
+        f"<given-names>{escape(name.split()[0])}</given-names></name></contrib>"
+        for name in work["authors"]
+    )
+    return (
+        "<article><front>"
+        f"<journal-meta><journal-title-group><journal-title>{escape(work['journal'])}</journal-title></journal-title-group></journal-meta>"
+        "<article-meta>"
+        f'<article-id pub-id-type="pmc">{i}</article-id>'
+        f'<article-id pub-id-type="doi">{work["doi"]}</article-id>'
+        f"<title-group><article-title>{escape(work['title'])}</article-title></title-group>"
+        f"<contrib-group>{contribs}</contrib-group>"
+        f"<aff>Faculty of Medicine, {work['country']}</aff>"
+        f"<pub-date><year>{work['year']}</year></pub-date>"
+        f"<abstract><p>{escape(' '.join(work['abstract']))}</p></abstract>"
+        "</article-meta></front></article>"
+    )
+
+
+# ------------------ Handlers ------------------
+
+async def simulate(request):
+    """Aplica la latencia configurada y, según error_rate, responde 503."""
+    config = request.app["config"]
+    if config.latency:
+        await asyncio.sleep(config.latency)
+    if config.error_rate and config.random.random() < config.error_rate:
+        return web.Response(status=503, headers={"Retry-After": "0"})
+    return None
+
+
+def int_param(request, name, default):
+    try:
+        return int(request.query.get(name, default))
+    except ValueError:
+        return default
+
+
+async def openalex_works(request):
+    error = await simulate(request)
+    if error is not None:
+        return error
+    config = request.app["config"]
+    cursor = request.query.get("cursor", "*")
+    start = 0 if cursor == "*" else int(cursor)
+    per_page = min(int_param(request, "per_page", 25), 200)
+    end = min(start + per_page, config.records)
+    results = [openalex_work(i, config.abstract_words) for i in range(start, end)]
+    return web.json_response({
+        "meta": {"count": config.records, "next_cursor": str(end) if end < config.records else None},
+        "results": results
+    })
+
+
+async def arxiv_query(request):
+    error = await simulate(request)
+    if error is not None:
+        return error
+    config = request.app["config"]
+    start = int_param(request, "start", 0)
+    end = min(start + int_param(request, "max_results", 10), config.records)
+    entries = "".join(arxiv_entry(i, config.abstract_words) for i in range(start, end))
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<title>Mock arXiv</title>{entries}</feed>"
+    )
+    return web.Response(body=body.encode("utf-8"), content_type="application/atom+xml")
+
+
+async def eutils_esearch(request):
+    error = await simulate(request)
+    if error is not None:
+        return error
+    config = request.app["config"]
+    retmax = min(int_param(request, "retmax", 20), config.records)
+    return web.json_response({
+        "esearchresult": {
+            "count": str(config.records),
+            "idlist": [str(i) for i in range(retmax)],
+            "webenv": "MOCK_WEBENV",
+            "querykey": "1"
+        }
+    })
+
+
+async def eutils_efetch(request):
+    error = await simulate(request)
+    if error is not None:
+        return error
+    config = request.app["config"]
+    if "id" in request.query:
+        ids = [int(pmcid) for pmcid in request.query["id"].split(",") if pmcid]
+    else:
+        start = int_param(request, "retstart", 0)
+        ids = range(start, min(start + int_param(request, "retmax", 20), config.records))
+    articles = "".join(pmc_article(i, config.abstract_words) for i in ids)
+    body = f'<?xml version="1.0" encoding="UTF-8"?><pmc-articleset>{articles}</pmc-articleset>'
+    return web.Response(body=body.encode("utf-8"), content_type="application/xml")
+
+
+def create_app(config=None):
+    app = web.Application()
+    app["config"] = config or MockApiConfig()
+    app.router.add_get("/openalex/works", openalex_works)
+    app.router.add_get("/arxiv/api/query", arxiv_query)
+    app.router.add_get("/eutils/esearch.fcgi", eutils_esearch)
+    app.router.add_get("/eutils/efetch.fcgi", eutils_efetch)
+    return app
+
+
+def api_urls(base_url):
+    """URLs del downloader (OPENALEX_URL, ARXIV_URL, EUTILS_URL) apuntando al servidor simulado."""
+    return {
+        "OPENALEX_URL": f"{base_url}/openalex/works",
+        "ARXIV_URL": f"{base_url}/arxiv/api/query",
+        "EUTILS_URL": f"{base_url}/eutils"
+    }
+
+
+async def start_mock_server(config=None, host="127.0.0.1", port=DEFAULT_PORT):
+    """Levanta el servidor dentro del loop actual. Retorna (runner, base_url); cerrar con runner.cleanup()."""
+    runner = web.AppRunner(create_app(config), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner, f"http://{host}:{port}"
+
+
+def serve(config=None, host="127.0.0.1", port=DEFAULT_PORT):
+    """Ejecuta el servidor en primer plano (bloqueante)."""
+    web.run_app(create_app(config), host=host, port=port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="APIs simuladas de OpenAlex, arXiv y PubMed Central")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--records", type=int, default=10000, help="Registros disponibles por fuente")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia por petición en segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    print(f"🧪 APIs simuladas en {base_url}")
+    print(json.dumps(api_urls(base_url), indent=2))
+    serve(MockApiConfig(args.records, args.latency, args.error_rate), args.host, args.port)
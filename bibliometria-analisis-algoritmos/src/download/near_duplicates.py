@@ -0,0 +1,193 @@
+# src/download/near_duplicates.py
+"""
+Detección de casi-duplicados con MinHash + LSH (p. ej. preprint de arXiv y
+versión publicada en PubMed que difieren en un subtítulo o unas palabras).
+- Cada documento (título + abstract normalizados) se convierte en shingles de
+  SHINGLE_SIZE palabras, hasheados a 32 bits
+- La firma MinHash (num_perm mínimos) se calcula vectorizada con NumPy sobre
+  un bloque completo de documentos (hash multiply-shift por permutación)
+- LSH por bandas: documentos con una banda idéntica son candidatos; en las
+  cubetas de hasta MAX_BUCKET_PAIRS miembros se comparan todos los pares, en
+  las más grandes cada miembro solo contra el primero (ahí se pierde recall:
+  dos miembros que no se parecen al primero no se comparan en esa banda)
+- Solo son candidatos los documentos con al menos MIN_SHINGLES shingles:
+  títulos genéricos sin abstract ("Editorial", "Book Review") no se fusionan
+- Los candidatos se verifican con el Jaccard exacto de sus shingles y los
+  pares que superan el umbral se agrupan con union-find; nunca se unen
+  grupos con DOI distintos (igual que la deduplicación por título)
+Memoria: la firma (num_perm x 4 bytes) y los shingles de cada documento.
+"""
+from itertools import chain, combinations
+
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = 0.8
+SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+MIN_SHINGLES = 5
+MAX_BUCKET_PAIRS = 20
+
+# np.trapz pasó a llamarse np.trapezoid en NumPy 2
+integrate = getattr(np, "trapezoid", None) or np.trapz
+
+
+def shingle_hashes(texts, size=SHINGLE_SIZE):
+    """
+    Shingles de `size` palabras de cada texto (ya normalizado), como arreglos
+    uint32 ordenados y sin repetidos. Textos más cortos que size usan sus palabras.
+    Las palabras de todo el bloque se hashean de una vez y cada shingle combina
+    los hashes de sus palabras (sin construir las cadenas de los shingles).
+    """
+    words = [text.split() if isinstance(text, str) else [] for text in texts]
+    lengths = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+    result = [np.empty(0, dtype=np.uint32) for _ in texts]
+    if not lengths.sum():
+        return result
+
+    hashes = pd.util.hash_pandas_object(pd.Series(list(chain.from_iterable(words))), index=False).to_numpy()
+    combined = hashes[:len(hashes) - size + 1].copy() if len(hashes) >= size else hashes[:0]
+    with np.errstate(over="ignore"):
+        for k in range(1, size):
+            combined = combined * SHINGLE_MULTIPLIER + hashes[k:k + len(combined)]
+    combined = (combined >> np.uint64(32)).astype(np.uint32)
+    words_only = (hashes >> np.uint64(32)).astype(np.uint32)
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    for doc, (start, length) in enumerate(zip(starts.tolist(), lengths.tolist())):
+        if length >= size:
+            result[doc] = np.unique(combined[start:start + length - size + 1])
+        elif length:
+            result[doc] = np.unique(words_only[start:start + length])
+    return result
+
+
+class MinHasher:
+    """Firmas MinHash con num_perm funciones hash multiply-shift ((a*x + b) >> 32)."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, shingle_sets):
+        """
+        Matriz (documentos, num_perm) uint32. Los documentos sin shingles
+        quedan con el valor máximo y no se proponen como candidatos.
+        """
+        signatures = np.full((len(shingle_sets), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        docs = [i for i, s in enumerate(shingle_sets) if len(s)]
+        if not docs:
+            return signatures
+        values = np.concatenate([shingle_sets[i] for i in docs]).astype(np.uint64)
+        starts = np.cumsum([0] + [len(shingle_sets[i]) for i in docs[:-1]])
+        with np.errstate(over="ignore"):
+            for k in range(self.num_perm):
+                permuted = ((self.a[k] * values + self.b[k]) >> np.uint64(32)).astype(np.uint32)
+                signatures[docs, k] = np.minimum.reduceat(permuted, starts)
+        return signatures
+
+
+def lsh_params(num_perm=NUM_PERM, threshold=NEAR_DUP_THRESHOLD, fp_weight=0.2):
+    """
+    (bandas, filas por banda) que minimizan la suma ponderada de falsos
+    positivos y falsos negativos esperados para el umbral de Jaccard dado.
+    Los falsos positivos pesan menos: la verificación exacta los descarta y
+    solo cuestan una comparación (64 permutaciones, umbral 0.8 -> 8 x 8).
+    """
+    def probability(s, bands, rows):
+        return 1 - (1 - s ** rows) ** bands
+
+    best, best_error = (1, num_perm), float("inf")
+    below = np.linspace(0, threshold, 200)
+    above = np.linspace(threshold, 1, 200)
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_pos = integrate(probability(below, bands, rows), below)
+            false_neg = integrate(1 - probability(above, bands, rows), above)
+            error = fp_weight * false_pos + (1 - fp_weight) * false_neg
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def candidate_pairs(signatures, bands, rows, eligible=None, max_bucket=MAX_BUCKET_PAIRS):
+    """
+    Pares (i, j), i < j, que comparten al menos una banda de la firma. Las
+    cubetas de hasta max_bucket miembros aportan todos sus pares; las más
+    grandes, (primer miembro, otro miembro). Se excluyen los documentos
+    vacíos y los que no están en eligible (máscara booleana).
+    """
+    empty = np.iinfo(np.uint32).max
+    mask = signatures[:, 0] != empty
+    if eligible is not None:
+        mask &= eligible
+    valid = np.flatnonzero(mask)
+    pairs = set()
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[valid, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = counts[inverse] > 1
+        if not shared.any():
+            continue
+        # Miembros de cada cubeta compartida, contiguos y en orden de documento
+        members = valid[shared]
+        buckets = inverse[shared]
+        order = np.argsort(buckets, kind="stable")
+        members, buckets = members[order], buckets[order]
+        bounds = np.flatnonzero(np.diff(buckets)) + 1
+        for group in np.split(members, bounds):
+            group = group.tolist()
+            if len(group) <= max_bucket:
+                pairs.update(combinations(group, 2))
+            else:
+                pairs.update((group[0], other) for other in group[1:])
+    return pairs
+
+
+def jaccard(a, b):
+    """Jaccard exacto entre dos arreglos ordenados de shingles."""
+    if not len(a) or not len(b):
+        return 0.0
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    return inter / (len(a) + len(b) - inter)
+
+
+def find_near_duplicates(shingle_sets, signatures, threshold=NEAR_DUP_THRESHOLD, dois=None,
+                         min_shingles=MIN_SHINGLES):
+    """
+    Agrupa los documentos casi duplicados. Retorna {documento: (representante, jaccard)}
+    para cada documento que se fusiona en otro; el representante es el de menor índice.
+    dois (DOI normalizado o '' por documento) impide unir grupos con DOI distintos.
+    """
+    bands, rows = lsh_params(signatures.shape[1], threshold)
+    eligible = np.fromiter((len(s) >= min_shingles for s in shingle_sets), dtype=bool, count=len(shingle_sets))
+    parent = list(range(len(shingle_sets)))
+    # DOI de cada grupo (en su raíz); '' si ningún miembro tiene
+    group_doi = list(dois) if dois is not None else [""] * len(shingle_sets)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    scores = {}
+    for i, j in sorted(candidate_pairs(signatures, bands, rows, eligible)):
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            continue
+        if group_doi[ri] and group_doi[rj] and group_doi[ri] != group_doi[rj]:
+            continue
+        score = jaccard(shingle_sets[i], shingle_sets[j])
+        if score >= threshold:
+            root, child = min(ri, rj), max(ri, rj)
+            parent[child] = root
+            group_doi[root] = group_doi[root] or group_doi[child]
+            for doc in (i, j):
+                scores[doc] = max(scores.get(doc, 0.0), score)
+
+    return {doc: (find(doc), score) for doc, score in scores.items() if find(doc) != doc}
@@ -0,0 +1,133 @@
+# src/download/pmc_parser.py
+"""
+Parser de respuestas efetch de PubMed Central (XML JATS).
+- iter_pmc_articles recorre el XML con iterparse y entrega cada <article> al
+  cerrarse, liberando su contenido después de procesarlo
+- parse_pmc_articleset es una función de módulo (serializable) para poder
+  ejecutarse en un pool de procesos o hilos con run_in_executor
+"""
+import io
+import xml.etree.ElementTree as ET
+
+from src.download.countries import extract_countries_from_texts
+
+
+def parse_pmc_article(article, pmcid=""):
+    """
+    Extrae los campos de un elemento <article> (JATS) de PubMed Central.
+    Retorna un diccionario con el esquema común o None si no tiene título.
+    """
+    # Identificador PMC (el del propio XML tiene prioridad)
+    for id_type in ("pmc", "pmcid"):
+        id_elem = article.find(f".//article-id[@pub-id-type='{id_type}']")
+        if id_elem is not None and id_elem.text:
+            pmcid = id_elem.text.strip().replace("PMC", "")
+            break
+    
+    # Extraer campos
+    title = ""
+    title_elem = article.find(".//article-title")
+    if title_elem is not None:
+        title = "".join(title_elem.itertext()).strip()
+    
+    if not title:
+        return None
+    
+    # Autores y afiliaciones (primero las de cada autor, luego las generales)
+    authors_list = []
+    aff_texts = []
+    
+    for contrib in article.findall(".//contrib[@contrib-type='author']"):
+        surname = contrib.find(".//surname")
+        given = contrib.find(".//given-names")
+        if surname is not None:
+            name = surname.text or ""
+            if given is not None and given.text:
+                name = f"{given.text} {name}"
+            authors_list.append(name)
+        
+        aff = contrib.find(".//aff")
+        if aff is not None:
+            aff_texts.append("".join(aff.itertext()).strip())
+    
+    for aff in article.findall(".//aff"):
+        aff_texts.append("".join(aff.itertext()).strip())
+    
+    # País: el primero que se resuelva en el orden anterior
+    country = next((c for c in extract_countries_from_texts(aff_texts) if c), "")
+    
+    authors = ", ".join(authors_list)
+    
+    # Abstract
+    abstract = ""
+    abstract_elem = article.find(".//abstract")
+    if abstract_elem is not None:
+        abstract = " ".join(abstract_elem.itertext()).strip()
+    
+    # DOI
+    doi = ""
+    doi_elem = article.find(".//article-id[@pub-id-type='doi']")
+    if doi_elem is not None:
+        doi = doi_elem.text or ""
+    
+    # Año
+    year = ""
+    year_elem = article.find(".//pub-date/year")
+    if year_elem is not None:
+        year = year_elem.text or ""
+    
+    # Journal
+    journal = ""
+    journal_elem = article.find(".//journal-title")
+    if journal_elem is not None:
+        journal = journal_elem.text or ""
+    
+    # URL
+    url = f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{pmcid}/"
+    
+    return {
+        "title": title,
+        "authors": authors,
+        "abstract": abstract,
+        "doi": doi,
+        "year": year,
+        "journal": journal,
+        "url": url,
+        "country": country,
+        "source": "PubMed"
+    }
+
+def iter_pmc_articles(xml_body):
+    """
+    Recorre en streaming un <pmc-articleset> y entrega cada <article> de primer
+    nivel en cuanto termina; el elemento se vacía cuando el consumidor avanza.
+    """
+    if isinstance(xml_body, str):
+        xml_body = xml_body.encode("utf-8")
+    depth = 0
+    for event, elem in ET.iterparse(io.BytesIO(xml_body), events=("start", "end")):
+        if elem.tag != "article":
+            continue
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            yield elem
+            elem.clear()
+
+def parse_pmc_articleset(xml_body, pmcids=()):
+    """
+    Divide la respuesta multi-artículo de efetch (<pmc-articleset>) en registros.
+    pmcids se usa como respaldo, en orden, cuando un artículo no trae su id PMC.
+    """
+    records = []
+    for i, article in enumerate(iter_pmc_articles(xml_body)):
+        fallback_id = pmcids[i] if i < len(pmcids) else ""
+        try:
+            record = parse_pmc_article(article, fallback_id)
+            if record:
+                records.append(record)
+        except Exception as e:
+            print(f"⚠️ Error procesando artículo {fallback_id}: {e}")
+    return records
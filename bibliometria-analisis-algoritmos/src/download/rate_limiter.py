@@ -0,0 +1,132 @@
+# src/download/rate_limiter.py
+"""
+Limitador de peticiones asíncrono compartido por las fuentes del downloader.
+- Un token bucket por host (tasa en peticiones/segundo + ráfaga máxima) y,
+  opcionalmente, un máximo de peticiones simultáneas en vuelo
+- Pausa global del host cuando el servidor pide esperar (429 / Retry-After)
+- Utilidades de reintento: backoff exponencial con jitter y lectura de Retry-After
+"""
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Límites publicados por cada API: host -> (peticiones/segundo, ráfaga)
+DEFAULT_RATE_LIMITS = {
+    "api.openalex.org": (10.0, 10),           # OpenAlex: 10 req/s (polite pool)
+    "export.arxiv.org": (1 / 3, 1),           # arXiv: 1 petición cada 3 s
+    "eutils.ncbi.nlm.nih.gov": (3.0, 1),      # E-utilities sin API key: 3 req/s
+}
+DEFAULT_RATE = (5.0, 5)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token bucket asíncrono: `rate` tokens por segundo, hasta `capacity` acumulados.
+    Con `concurrency` limita además las peticiones simultáneas (ver RateLimiter.slot).
+    """
+
+    def __init__(self, rate, capacity=1, concurrency=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.slots = asyncio.Semaphore(concurrency) if concurrency else None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Espera hasta que haya un token disponible y lo consume."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Bloquea el bucket durante `seconds` (p. ej. tras un 429 con Retry-After)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class RateLimiter:
+    """Registro de token buckets por host."""
+
+    def __init__(self, limits=None, default=DEFAULT_RATE):
+        self.limits = dict(DEFAULT_RATE_LIMITS)
+        self.limits.update(limits or {})
+        self.default = default
+        self.concurrency = {}
+        self.buckets = {}
+
+    def configure(self, host, rate=None, capacity=None, concurrency=None):
+        """
+        Ajusta el límite de un host (lo que no se indique conserva su valor actual).
+        Debe llamarse antes de que el host reciba peticiones.
+        """
+        current_rate, current_capacity = self.limits.get(host, self.default)
+        self.limits[host] = (rate or current_rate, capacity or current_capacity)
+        if concurrency:
+            self.concurrency[host] = concurrency
+        self.buckets.pop(host, None)
+
+    def bucket(self, url):
+        host = urlparse(url).hostname or ""
+        if host not in self.buckets:
+            rate, capacity = self.limits.get(host, self.default)
+            self.buckets[host] = TokenBucket(rate, capacity, self.concurrency.get(host))
+        return self.buckets[host]
+
+    async def acquire(self, url):
+        await self.bucket(url).acquire()
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Ocupa un lugar de concurrencia del host (si tiene) y consume un token."""
+        bucket = self.bucket(url)
+        if bucket.slots is None:
+            await bucket.acquire()
+            yield
+        else:
+            async with bucket.slots:
+                await bucket.acquire()
+                yield
+
+    def pause(self, url, seconds):
+        self.bucket(url).pause(seconds)
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Backoff exponencial con jitter completo: uniforme en [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """
+    Interpreta la cabecera Retry-After (segundos o fecha HTTP).
+    Retorna los segundos a esperar o None si no se puede interpretar.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
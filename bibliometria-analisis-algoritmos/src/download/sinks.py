@@ -0,0 +1,207 @@
+# src/download/sinks.py
+"""
+Destinos (sinks) de los registros descargados.
+Los registros se escriben a medida que llegan y se vuelcan al disco cada
+chunk_size filas, así la memoria queda acotada y una descarga interrumpida
+conserva todo lo que ya se había volcado.
+Sin append, el archivo anterior se reemplaza recién con el primer bloque (o
+al cerrar, si la descarga terminó sin errores): una fuente que falla en su
+primera petición no deja vacío el archivo de la corrida previa, y desde el
+primer bloque lo volcado ya está en el archivo real que leen merger.py e
+incremental.py.
+- CsvSink:     CSV por bloques (formato por defecto, el que lee merger.py)
+- ParquetSink: un row group por bloque (requiere pyarrow)
+- SQLiteSink:  tabla `records`, un commit por bloque
+"""
+import os
+import sqlite3
+import pandas as pd
+
+# Esquema común de los registros de todas las fuentes
+RECORD_COLUMNS = ["title", "authors", "abstract", "doi", "year", "journal", "url", "country", "source"]
+
+DEFAULT_CHUNK_SIZE = 500
+
+SINK_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "sqlite": ".sqlite"
+}
+
+
+class RecordSink:
+    """Base de los sinks: acumula hasta chunk_size registros y los vuelca con _write_chunk."""
+
+    def __init__(self, path, append=False, chunk_size=DEFAULT_CHUNK_SIZE, columns=RECORD_COLUMNS):
+        self.path = path
+        self.append = append
+        self.chunk_size = chunk_size
+        self.columns = list(columns)
+        self.buffer = []
+        self.count = 0
+
+    def write(self, record):
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if self.buffer:
+            self._write_chunk(pd.DataFrame(self.buffer, columns=self.columns))
+            self.buffer = []
+
+    def close(self, completed=True):
+        """Vuelca lo pendiente. completed=False indica que la descarga terminó con error."""
+        self.flush()
+
+    def keep_output(self, completed):
+        """El archivo nuevo reemplaza al anterior si trae registros o la descarga terminó bien."""
+        return self.count > 0 or completed
+
+    def _write_chunk(self, df):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+
+class CsvSink(RecordSink):
+    """CSV escrito por bloques; con append=True agrega al archivo existente."""
+
+    def __init__(self, path, append=False, chunk_size=DEFAULT_CHUNK_SIZE, columns=RECORD_COLUMNS):
+        super().__init__(path, append, chunk_size, columns)
+        # Archivo nuevo: se reescribe (con cabecera) recién con el primer bloque
+        self._pending_reset = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+
+    def _write_chunk(self, df):
+        header = self._pending_reset
+        df.to_csv(self.path, mode="w" if header else "a", header=header, index=False, encoding='utf-8')
+        self._pending_reset = False
+
+    def close(self, completed=True):
+        super().close(completed)
+        if self._pending_reset:
+            if self.keep_output(completed):
+                pd.DataFrame(columns=self.columns).to_csv(self.path, index=False, encoding='utf-8')
+            elif os.path.exists(self.path):
+                print(f"⚠️ Sin registros por error: se conserva {self.path}")
+
+
+class ParquetSink(RecordSink):
+    """Parquet con un row group por bloque. No admite append."""
+
+    def __init__(self, path, append=False, chunk_size=DEFAULT_CHUNK_SIZE, columns=RECORD_COLUMNS):
+        if append:
+            raise ValueError("ParquetSink no admite append; usa CSV o SQLite para descargas incrementales")
+        super().__init__(path, append, chunk_size, columns)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSink requiere pyarrow (pip install pyarrow)") from e
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema([(c, pa.string()) for c in self.columns])
+        # El archivo anterior se reemplaza recién con el primer bloque
+        self._writer = None
+
+    def _open_writer(self):
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+        return self._writer
+
+    def _write_chunk(self, df):
+        df = df.astype("string")
+        table = self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._open_writer().write_table(table)
+
+    def close(self, completed=True):
+        super().close(completed)
+        if self._writer is None and not self.keep_output(completed):
+            if os.path.exists(self.path):
+                print(f"⚠️ Sin registros por error: se conserva {self.path}")
+            return
+        self._open_writer().close()
+
+
+class SQLiteSink(RecordSink):
+    """Tabla `records` en SQLite; cada bloque se inserta y confirma en una transacción."""
+
+    def __init__(self, path, append=False, chunk_size=DEFAULT_CHUNK_SIZE, columns=RECORD_COLUMNS, table="records"):
+        super().__init__(path, append, chunk_size, columns)
+        self.table = table
+        self._conn = sqlite3.connect(path)
+        # Sin append la tabla anterior se borra recién con el primer bloque (o al cerrar sin error)
+        self._pending_reset = not append
+        cols = ", ".join(f'"{c}" TEXT' for c in self.columns)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        self._conn.commit()
+
+    def _reset_table(self):
+        cols = ", ".join(f'"{c}" TEXT' for c in self.columns)
+        with self._conn:
+            self._conn.execute(f"DROP TABLE IF EXISTS {self.table}")
+            self._conn.execute(f"CREATE TABLE {self.table} ({cols})")
+        self._pending_reset = False
+
+    def _write_chunk(self, df):
+        if self._pending_reset:
+            self._reset_table()
+        placeholders = ", ".join("?" for _ in self.columns)
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        with self._conn:
+            self._conn.executemany(f"INSERT INTO {self.table} VALUES ({placeholders})", rows)
+
+    def close(self, completed=True):
+        super().close(completed)
+        if self._pending_reset and self.keep_output(completed):
+            self._reset_table()
+        self._conn.close()
+
+
+SINKS = {
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+    "sqlite": SQLiteSink
+}
+
+
+def sink_path(data_dir, name, output_format="csv"):
+    """Ruta del archivo de salida de una fuente según el formato."""
+    return os.path.join(data_dir, name + SINK_EXTENSIONS[output_format])
+
+
+def count_rows(path):
+    """Filas de datos de un archivo de salida (CSV, Parquet o SQLite); 0 si no existe o está vacío."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return 0
+    if path.endswith(SINK_EXTENSIONS["parquet"]):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if path.endswith(SINK_EXTENSIONS["sqlite"]):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            conn.close()
+    try:
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], dtype=str, chunksize=50_000))
+    except pd.errors.EmptyDataError:
+        return 0
+
+
+def open_sink(path, output_format="csv", append=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Crea el sink correspondiente al formato ('csv', 'parquet' o 'sqlite')."""
+    if output_format not in SINKS:
+        raise ValueError(f"Formato de salida desconocido: {output_format}")
+    return SINKS[output_format](path, append=append, chunk_size=chunk_size)
@@ -0,0 +1,73 @@
+# src/download/sources.py
+"""
+Registro de fuentes del downloader.
+Cada fuente es un SourceAdapter que:
+  - entrega registros normalizados (esquema sinks.RECORD_COLUMNS) desde un
+    generador asíncrono iter_records(ctx, query, max_results)
+  - declara sus hosts, su concurrencia máxima y, si hace falta, sus límites
+    de peticiones (por defecto los de rate_limiter.DEFAULT_RATE_LIMITS)
+Agregar una fuente = definir la clase y decorarla con @register_source;
+el planificador (downloader.run_all) la ejecuta en paralelo con las demás.
+"""
+
+
+class HarvestContext:
+    """Recursos compartidos por las fuentes de una misma descarga."""
+
+    def __init__(self, session, limiter, cache=None, known=None, sink=None, stats=None):
+        self.session = session
+        self.limiter = limiter
+        self.cache = cache
+        self.known = known
+        self.sink = sink
+        self.stats = stats  # telemetry.SourceStats de la fuente
+
+    def flush(self):
+        """Vuelca al disco lo que el sink tenga pendiente (p. ej. antes de un checkpoint)."""
+        if self.sink is not None:
+            self.sink.flush()
+
+
+class SourceAdapter:
+    """Interfaz común de las fuentes."""
+
+    name = ""            # clave usada en run_all(sources=[...]) y en el nombre del archivo
+    label = ""           # nombre para mostrar
+    hosts = ()           # hosts a los que hace peticiones
+    concurrency = 2      # peticiones simultáneas por host
+    rate_limits = {}     # host -> (peticiones/segundo, ráfaga); vacío = valores por defecto
+
+    def configure_limiter(self, limiter):
+        for host in self.hosts:
+            rate, capacity = self.rate_limits.get(host, (None, None))
+            limiter.configure(host, rate, capacity, concurrency=self.concurrency)
+
+    def append_output(self, query, path, max_results=None, incremental=False):
+        """True si la salida existente debe continuarse en lugar de reemplazarse."""
+        return False
+
+    async def iter_records(self, ctx, query, max_results):
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def on_complete(self, query):
+        """Se llama cuando la fuente terminó sin errores."""
+
+
+SOURCES = {}
+
+
+def register_source(adapter_cls):
+    """Decorador que registra una clase SourceAdapter bajo su `name`."""
+    SOURCES[adapter_cls.name] = adapter_cls
+    return adapter_cls
+
+
+def get_source(name, **options):
+    """Instancia la fuente registrada `name` (None si no existe)."""
+    adapter_cls = SOURCES.get(name)
+    return adapter_cls(**options) if adapter_cls else None
+
+
+def available_sources():
+    return list(SOURCES)
@@ -0,0 +1,184 @@
+# src/download/telemetry.py
+"""
+Métricas del downloader por fuente:
+- peticiones, reintentos, errores y aciertos de caché
+- bytes recibidos por la red (comprimidos, tal como llegan) y bytes del
+  cuerpo ya descomprimido (incluye las respuestas servidas desde la caché)
+- histograma de latencia de las peticiones (buckets en segundos)
+- tiempo esperando al limitador de peticiones y tiempo de parseo
+- registros guardados y registros por segundo
+Telemetry agrupa las métricas de todas las fuentes de un run_all y se exporta
+a JSON (data/download/telemetry.json) para revisarla o mostrarla en Streamlit.
+Comparando tiempo de red, espera del limitador y parseo se ve qué limita
+cada descarga.
+"""
+import os
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Límites superiores (segundos) de los buckets del histograma de latencia
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf")]
+
+
+def timed_call(func, *args):
+    """
+    Ejecuta func(*args) y retorna (resultado, segundos).
+    Es una función de módulo para poder medir trabajo enviado a un pool de procesos.
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class SourceStats:
+    """Métricas acumuladas de una fuente."""
+
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.bytes = 0          # recibidos por la red (antes de descomprimir)
+        self.decoded_bytes = 0  # cuerpos descomprimidos, red + caché
+        self.retries = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS)
+        self.wait_time = 0.0
+        self.parse_time = 0.0
+        self.records = 0
+        self.started = None
+        self.finished = None
+
+    def record_request(self, latency, nbytes, decoded_bytes=None):
+        self.requests += 1
+        self.bytes += nbytes
+        self.decoded_bytes += nbytes if decoded_bytes is None else decoded_bytes
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_cache_hit(self, nbytes):
+        """Respuesta desde la caché: no pasa por la red, solo suma bytes descomprimidos."""
+        self.cache_hits += 1
+        self.decoded_bytes += nbytes
+
+    def record_retry(self, network_error=False):
+        self.retries += 1
+        self.errors += network_error
+
+    def record_wait(self, seconds):
+        self.wait_time += seconds
+
+    def record_parse(self, seconds):
+        self.parse_time += seconds
+
+    @contextmanager
+    def parsing(self):
+        """Suma al tiempo de parseo lo que tarde el bloque."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.parse_time += time.perf_counter() - started
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self, records):
+        self.records = records
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def latency_percentile(self, q):
+        """Percentil aproximado: límite superior del bucket que lo contiene."""
+        if not self.requests:
+            return 0.0
+        target = q * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram):
+            seen += count
+            if seen >= target:
+                return bound if bound != float("inf") else self.latency_max
+        return self.latency_max
+
+    def bottleneck(self):
+        """Qué domina el tiempo de la fuente: red, limitador de peticiones o parseo."""
+        costs = {"red": self.latency_total, "limitador": self.wait_time, "parseo": self.parse_time}
+        if not any(costs.values()):
+            return ""
+        return max(costs, key=costs.get)
+
+    def to_dict(self):
+        elapsed = self.elapsed
+        return {
+            "source": self.name,
+            "records": self.records,
+            "elapsed_s": round(elapsed, 3),
+            "records_per_s": round(self.records / elapsed, 2) if elapsed else 0.0,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "network_errors": self.errors,
+            "bytes": self.bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "latency_mean_s": round(self.latency_total / self.requests, 4) if self.requests else 0.0,
+            "latency_p50_s": round(self.latency_percentile(0.5), 4),
+            "latency_p95_s": round(self.latency_percentile(0.95), 4),
+            "latency_max_s": round(self.latency_max, 4),
+            "latency_histogram": {
+                ("+inf" if bound == float("inf") else f"<={bound}"): count
+                for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram)
+            },
+            "network_time_s": round(self.latency_total, 3),
+            "rate_limit_wait_s": round(self.wait_time, 3),
+            "parse_time_s": round(self.parse_time, 3),
+            "bottleneck": self.bottleneck()
+        }
+
+
+class Telemetry:
+    """Métricas de todas las fuentes de una descarga."""
+
+    def __init__(self):
+        self.sources = {}
+
+    def source(self, name):
+        if name not in self.sources:
+            self.sources[name] = SourceStats(name)
+        return self.sources[name]
+
+    def to_dict(self):
+        return {name: stats.to_dict() for name, stats in self.sources.items()}
+
+    def export_json(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def print_summary(self):
+        print("\n📈 Métricas de descarga:")
+        for stats in self.sources.values():
+            data = stats.to_dict()
+            print(f"   • {stats.name}: {data['records']} artículos en {data['elapsed_s']:.1f}s "
+                  f"({data['records_per_s']:.1f}/s) | {data['requests']} peticiones, "
+                  f"{data['cache_hits']} de caché, {data['retries']} reintentos, "
+                  f"{data['bytes'] / 1e6:.2f} MB de red ({data['decoded_bytes'] / 1e6:.2f} MB descomprimidos) | latencia p50 {data['latency_p50_s']}s "
+                  f"p95 {data['latency_p95_s']}s | limitador {data['rate_limit_wait_s']:.1f}s, "
+                  f"parseo {data['parse_time_s']:.2f}s → {data['bottleneck'] or '-'}")
+
+
+def load_telemetry(path):
+    """Lee un telemetry.json exportado (None si no existe)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,248 @@
+# src/download/unified_store.py
+"""
+Almacén columnar de los artículos unificados (data/download/unified.parquet).
+merger.py lo actualiza cada vez que escribe unified.csv; las etapas
+siguientes (similitud, clustering, visualización, análisis) lo leen con
+load_unified en lugar de volver a parsear el CSV.
+Esquema explícito:
+  - record_id                 -> int64 (id del artículo asignado por merger.py)
+  - year                      -> Int16 (primer año de 4 dígitos; nulo si no hay)
+  - source / country / journal -> categóricas (columnas diccionario en Parquet)
+  - resto de columnas          -> texto
+El almacén es un directorio de partes Parquet (part-00000.parquet, ...) y un
+_store.json con el tamaño y la fecha del unified.csv que refleja. Las uniones
+incrementales agregan una parte con las filas nuevas del CSV; las completas
+lo reescriben. load_unified lee solo las columnas pedidas (projection) con
+memory map; si falta pyarrow o el almacén no corresponde al CSV actual, lee
+unified.csv con los mismos tipos. export_csv vuelve a generar el CSV.
+"""
+import os
+import json
+import shutil
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data/download")
+
+UNIFIED_FILE = "unified.csv"
+STORE_FILE = "unified.parquet"
+STATE_FILE = "_store.json"  # pyarrow ignora los archivos que empiezan con _
+STORE_VERSION = 1
+STORE_CHUNK_SIZE = 50_000
+# Sobre este número de partes la siguiente actualización compacta el almacén
+MAX_STORE_PARTS = 32
+
+ID_COLUMN = "record_id"
+YEAR_COLUMN = "year"
+CATEGORY_COLUMNS = ["source", "country", "journal"]
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def store_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, STORE_FILE)
+
+
+def unified_available(data_dir=DATA_DIR):
+    """Hay artículos unificados (CSV o almacén columnar)."""
+    return os.path.exists(os.path.join(data_dir, UNIFIED_FILE)) or os.path.exists(store_path(data_dir))
+
+
+# ------------------ Tipos ------------------
+
+def typed_frame(df):
+    """Aplica el esquema del almacén a las columnas presentes de un DataFrame leído del CSV."""
+    typed = {}
+    if ID_COLUMN in df:
+        typed[ID_COLUMN] = pd.to_numeric(df[ID_COLUMN], errors="coerce").astype("Int64")
+    if YEAR_COLUMN in df:
+        years = df[YEAR_COLUMN].astype("string").str.extract(r"(\d{4})", expand=False)
+        typed[YEAR_COLUMN] = pd.to_numeric(years, errors="coerce").astype("Int16")
+    for c in CATEGORY_COLUMNS:
+        if c in df:
+            typed[c] = df[c].astype("category")
+    return df.assign(**typed)
+
+
+def store_schema(columns):
+    """Esquema Arrow del almacén para las columnas de unified.csv."""
+    import pyarrow as pa
+    fields = []
+    for c in columns:
+        if c == ID_COLUMN:
+            fields.append((c, pa.int64()))
+        elif c == YEAR_COLUMN:
+            fields.append((c, pa.int16()))
+        elif c in CATEGORY_COLUMNS:
+            fields.append((c, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append((c, pa.string()))
+    return pa.schema(fields)
+
+
+# ------------------ Escritura ------------------
+
+def load_state(path):
+    try:
+        with open(os.path.join(path, STATE_FILE), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STORE_VERSION else None
+
+
+def save_state(path, state):
+    with open(os.path.join(path, STATE_FILE), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def csv_header(csv_path):
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def is_fresh(state, csv_path):
+    """El almacén refleja exactamente el unified.csv actual."""
+    if state is None:
+        return False
+    stat = os.stat(csv_path)
+    return state["csv_size"] == stat.st_size and state["csv_mtime_ns"] == stat.st_mtime_ns
+
+
+def iter_csv(csv_path, columns, chunk_size=STORE_CHUNK_SIZE, offset=0):
+    """Bloques de unified.csv como texto desde el byte offset (0 = desde la cabecera)."""
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        if offset:
+            f.seek(offset)
+            yield from pd.read_csv(f, dtype=str, chunksize=chunk_size, header=None, names=columns)
+        else:
+            yield from pd.read_csv(f, dtype=str, chunksize=chunk_size)
+
+
+def write_part(csv_path, part_path, columns, offset, chunk_size):
+    """Escribe las filas de csv_path desde offset en una parte Parquet (un row group por bloque). Retorna las filas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = store_schema(columns)
+    rows = 0
+    with pq.ParquetWriter(part_path, schema) as writer:
+        for chunk in iter_csv(csv_path, columns, chunk_size, offset):
+            table = pa.Table.from_pandas(typed_frame(chunk), schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    return rows
+
+
+def update_unified_store(csv_path, append=False, chunk_size=STORE_CHUNK_SIZE):
+    """
+    Actualiza el almacén columnar junto a csv_path (unified.csv -> unified.parquet).
+    Con append=True (el CSV solo creció al final) se agrega una parte con las
+    filas nuevas; si no, o si el almacén no es compatible, se reescribe completo.
+    No hace nada si el almacén ya corresponde al CSV. Retorna la ruta del
+    almacén, o None si pyarrow no está instalado.
+    """
+    if not has_pyarrow():
+        print("⚠️ pyarrow no está instalado: las etapas siguientes leerán unified.csv")
+        return None
+    path = os.path.join(os.path.dirname(csv_path), STORE_FILE)
+    state = load_state(path)
+    if is_fresh(state, csv_path):
+        return path
+
+    columns = csv_header(csv_path)
+    stat = os.stat(csv_path)
+    if (append and state is not None and state["columns"] == columns
+            and state["csv_size"] <= stat.st_size and len(state["parts"]) < MAX_STORE_PARTS):
+        part = f"part-{len(state['parts']):05d}.parquet"
+        rows = write_part(csv_path, os.path.join(path, part), columns, state["csv_size"], chunk_size)
+        state.update({"csv_size": stat.st_size, "csv_mtime_ns": stat.st_mtime_ns,
+                      "rows": state["rows"] + rows, "parts": state["parts"] + [part]})
+        save_state(path, state)
+        return path
+
+    # Reescritura completa en un temporal: una falla no deja el almacén a medias
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        part = "part-00000.parquet"
+        rows = write_part(csv_path, os.path.join(tmp, part), columns, 0, chunk_size)
+        save_state(tmp, {
+            "version": STORE_VERSION,
+            "csv_size": stat.st_size,
+            "csv_mtime_ns": stat.st_mtime_ns,
+            "rows": rows,
+            "columns": columns,
+            "parts": [part]
+        })
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+# ------------------ Lectura ------------------
+
+def load_unified(data_dir=DATA_DIR, columns=None, memory_map=True):
+    """
+    Artículos unificados con el esquema del almacén. columns limita la lectura
+    a esas columnas (las que no existan se omiten). Lee unified.parquet si
+    corresponde al unified.csv actual; si no, el CSV.
+    """
+    csv_path = os.path.join(data_dir, UNIFIED_FILE)
+    path = store_path(data_dir)
+    state = load_state(path) if has_pyarrow() else None
+    if state is not None and (not os.path.exists(csv_path) or is_fresh(state, csv_path)):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        wanted = state["columns"] if columns is None else [c for c in columns if c in state["columns"]]
+        table = pq.read_table(
+            [os.path.join(path, p) for p in state["parts"]],
+            columns=wanted,
+            memory_map=memory_map,
+            read_dictionary=[c for c in CATEGORY_COLUMNS if c in wanted]
+        )
+        # Enteros con nulos de pandas (Int16 / Int64) en lugar de float
+        nullable = {pa.int16(): pd.Int16Dtype(), pa.int64(): pd.Int64Dtype()}
+        return table.to_pandas(types_mapper=nullable.get)
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"No se encontró el archivo: {csv_path}\n"
+                                f"Asegúrate de ejecutar primero run_downloader.py")
+    usecols = None if columns is None else (lambda c: c in columns)
+    return typed_frame(pd.read_csv(csv_path, usecols=usecols))
+
+
+def export_csv(data_dir=DATA_DIR, out_path=None, columns=None):
+    """Escribe el almacén columnar como CSV (por defecto unified.csv) por row groups. Retorna la ruta."""
+    import pyarrow.parquet as pq
+    path = store_path(data_dir)
+    state = load_state(path)
+    if state is None:
+        raise FileNotFoundError(f"No se encontró el almacén columnar: {path}")
+    out_path = out_path or os.path.join(data_dir, UNIFIED_FILE)
+    tmp = out_path + ".tmp"
+    first = True
+    try:
+        for part in state["parts"]:
+            for batch in pq.ParquetFile(os.path.join(path, part)).iter_batches(columns=columns):
+                batch.to_pandas().to_csv(tmp, mode="w" if first else "a", header=first, index=False)
+                first = False
+        if first:
+            pd.DataFrame(columns=columns or state["columns"]).to_csv(tmp, index=False)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if os.path.abspath(out_path) == os.path.abspath(os.path.join(data_dir, UNIFIED_FILE)) and columns is None:
+        # El almacén sigue correspondiendo al CSV regenerado
+        stat = os.stat(out_path)
+        state.update({"csv_size": stat.st_size, "csv_mtime_ns": stat.st_mtime_ns})
+        save_state(path, state)
+    return out_path
@@ -1,4 +1,5 @@
 from sentence_transformers import SentenceTransformer, util
+from src.similarity.embedding_cache import DEFAULT_MODEL
 
 # Cargamos un modelo pequeño de Sentence-BERT
 model = SentenceTransformer('all-MiniLM-L6-v2')
@@ -16,7 +17,7 @@ def transformer_embedding_similarity(text1: str, text2: str) -> float:
     sim = util.cos_sim(embeddings[0], embeddings[1])
     return float(sim.item())
 
-def load_sentence_model(model_name="sentence-transformers/all-MiniLM-L6-v2"):
+def load_sentence_model(model_name=DEFAULT_MODEL):
     """Carga el modelo preentrenado para embeddings semánticos."""
     print("🧠 Cargando modelo:", model_name)
     model = SentenceTransformer(model_name)
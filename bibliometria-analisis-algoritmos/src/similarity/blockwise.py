@@ -0,0 +1,154 @@
+# src/similarity/blockwise.py
+"""
+Similitud coseno por bloques con memoria acotada.
+En lugar de la matriz densa n x n (1.6 GB con n = 20k en float32), los
+vectores normalizados se multiplican por bloques de block_size filas contra
+todo el corpus y de cada bloque solo se conservan:
+  - los pares sobre el umbral (threshold), y/o
+  - los top_k vecinos de cada fila
+Memoria pico: workers x block_size x n puntajes (x3 por los temporales de la
+selección), más los pares conservados. Por defecto workers se limita a
+MAX_WORKERS y a lo que cabe en MEMORY_BUDGET; el producto de matrices ya usa
+varios hilos de BLAS, así que más hilos propios solo compiten por los núcleos.
+Para pares i < j cada bloque solo se compara con las filas desde su inicio
+(la mitad de las multiplicaciones de la matriz completa).
+Los bloques se calculan en paralelo con un pool de hilos (el producto de
+matrices de NumPy / SciPy libera el GIL).
+Acepta embeddings densos (np.ndarray o tensores de torch) y matrices
+dispersas de SciPy (p. ej. TF-IDF).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+BLOCK_SIZE = 1024
+MAX_WORKERS = 4
+MEMORY_BUDGET = 1 << 30  # bytes para los bloques de puntajes en vuelo
+
+
+def default_workers(n, block_size=BLOCK_SIZE, memory_budget=MEMORY_BUDGET):
+    """Hilos por defecto: hasta MAX_WORKERS, sin pasar de los núcleos ni del presupuesto de memoria."""
+    per_block = 3 * block_size * max(n, 1) * np.dtype(np.float32).itemsize
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1, memory_budget // per_block))
+
+
+def as_matrix(vectors):
+    """Matriz NumPy / SciPy con filas de norma 1 (los tensores de torch se pasan a CPU)."""
+    if hasattr(vectors, "detach"):
+        vectors = vectors.detach().cpu().numpy()
+    if sparse.issparse(vectors):
+        vectors = sparse.csr_matrix(vectors, dtype=np.float32)
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1))).ravel()
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(vectors).tocsr()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def block_scores(matrix, start, stop, offset=0):
+    """Puntajes coseno densos (stop - start, n - offset) de las filas start:stop contra las filas offset: del corpus."""
+    scores = matrix[start:stop] @ matrix[offset:].T
+    if sparse.issparse(scores):
+        scores = scores.toarray()
+    return np.asarray(scores, dtype=np.float32)
+
+
+def select_block(scores, start, threshold=None, top_k=None, upper=True):
+    """
+    Pares (filas, columnas, puntajes) conservados de un bloque.
+    upper=True: scores son las filas start: contra las columnas start: (block_scores
+    con offset=start) y se deja solo j > i (cada par una vez); si no, scores cubre
+    todas las columnas y solo se excluye i == j.
+    Con top_k se toman los top_k mejores de cada fila (y sobre threshold si se da).
+    """
+    rows = np.arange(start, start + len(scores))
+    offset = start if upper else 0
+    if upper:
+        scores[np.tril_indices(len(scores), 0, scores.shape[1])] = -np.inf
+    else:
+        scores[np.arange(len(scores)), rows] = -np.inf
+
+    if top_k is not None and top_k < scores.shape[1]:
+        best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        local = np.repeat(np.arange(len(scores)), best.shape[1])
+        block_cols = best.ravel()
+    else:
+        local, block_cols = np.nonzero(scores > (-np.inf if threshold is None else threshold))
+        if top_k is not None:
+            order = np.lexsort((-scores[local, block_cols], local))
+            local, block_cols = local[order], block_cols[order]
+
+    values = scores[local, block_cols]
+    keep = values > (-np.inf if threshold is None else threshold)
+    return rows[local[keep]], block_cols[keep] + offset, values[keep]
+
+
+def iter_similar_pairs(vectors, threshold=None, top_k=None, block_size=BLOCK_SIZE, workers=None, upper=True):
+    """
+    Genera, bloque a bloque y en orden, arreglos (filas, columnas, puntajes)
+    con los pares sobre threshold y/o los top_k vecinos de cada fila.
+    Sin threshold ni top_k se conservarían todos los pares: se exige alguno.
+    """
+    if threshold is None and top_k is None:
+        raise ValueError("Indica threshold, top_k o ambos")
+    matrix = as_matrix(vectors)
+    n = matrix.shape[0]
+
+    def run(start):
+        stop = min(start + block_size, n)
+        # Con upper las columnas anteriores al bloque ya se compararon: no se calculan
+        scores = block_scores(matrix, start, stop, offset=start if upper else 0)
+        return select_block(scores, start, threshold, top_k, upper)
+
+    workers = workers or default_workers(n, block_size)
+    starts = range(0, n, block_size)
+    if workers == 1 or n <= block_size:
+        yield from map(run, starts)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Como mucho 2 x workers bloques en vuelo: los puntajes no se acumulan
+        pending = []
+        for start in starts:
+            pending.append(pool.submit(run, start))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def similarity_matrix(vectors, threshold=None, top_k=None, block_size=BLOCK_SIZE, workers=None, upper=True):
+    """Pares conservados como matriz dispersa CSR n x n (puntajes en float32)."""
+    n = vectors.shape[0]
+    blocks = list(iter_similar_pairs(vectors, threshold, top_k, block_size, workers, upper))
+    if not blocks:
+        return sparse.csr_matrix((n, n), dtype=np.float32)
+    rows, cols, scores = (np.concatenate(parts) for parts in zip(*blocks))
+    return sparse.csr_matrix((scores, (rows, cols)), shape=(n, n))
+
+
+def similar_pairs_frame(titles, vectors, threshold=None, top_k=None, block_size=BLOCK_SIZE, workers=None):
+    """
+    Pares similares con las columnas de siempre (articulo_1, articulo_2, similaridad).
+    Sin top_k cada par aparece una vez (i < j); con top_k, cada artículo con sus vecinos.
+    """
+    titles = np.asarray(titles, dtype=object)
+    frames = [
+        pd.DataFrame({
+            "articulo_1": titles[rows],
+            "articulo_2": titles[cols],
+            "similaridad": scores.astype(np.float64).round(3)
+        })
+        for rows, cols, scores in iter_similar_pairs(vectors, threshold, top_k, block_size, workers,
+                                                     upper=top_k is None)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["articulo_1", "articulo_2", "similaridad"])
+    return pd.concat(frames, ignore_index=True)
@@ -2,7 +2,7 @@ import math
 import textdistance
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import pandas as pd
+from src.similarity.blockwise import BLOCK_SIZE, similar_pairs_frame
 
 def levenshtein_similarity(text1: str, text2: str) -> float:
     dist = textdistance.levenshtein.distance(text1, text2)
@@ -32,18 +32,8 @@ def spacy_embedding_similarity(text1: str, text2: str) -> float:
     return doc1.similarity(doc2)
 
 
-def tfidf_similarity(texts, titles, threshold=0.75):
-    """Calcula similitud usando TF-IDF + Coseno."""
+def tfidf_similarity(texts, titles, threshold=0.75, top_k=None, block_size=BLOCK_SIZE):
+    """Calcula similitud usando TF-IDF + Coseno, por bloques sobre la matriz dispersa."""
     tfidf = TfidfVectorizer(stop_words="english").fit_transform(texts)
-    sim_matrix = cosine_similarity(tfidf)
-    pairs = []
-    for i in range(len(titles)):
-        for j in range(i + 1, len(titles)):
-            if sim_matrix[i][j] > threshold:
-                pairs.append({
-                    "articulo_1": titles[i],
-                    "articulo_2": titles[j],
-                    "similaridad": round(sim_matrix[i][j], 3)
-                })
-    return pd.DataFrame(pairs)
+    return similar_pairs_frame(titles, tfidf, threshold, top_k, block_size)
 
@@ -1,5 +1,6 @@
 import pandas as pd
-from sentence_transformers import util
+from src.download.unified_store import load_unified
+from src.similarity.blockwise import BLOCK_SIZE, similar_pairs_frame
 from src.similarity.classical import (
     levenshtein_similarity,
     jaccard_similarity,
@@ -11,8 +12,12 @@ from src.similarity.ai_models import (
     transformer_embedding_similarity
 )
 
-def comparar_abstracts(csv_path="data/unified.csv", titulo1=None, titulo2=None):
-    df = pd.read_csv(csv_path)
+def comparar_abstracts(csv_path=None, titulo1=None, titulo2=None):
+    """Compara los abstracts de dos títulos; sin csv_path usa los artículos unificados."""
+    if csv_path is None:
+        df = load_unified(columns=["title", "abstract"])
+    else:
+        df = pd.read_csv(csv_path, usecols=["title", "abstract"])
     if titulo1 not in df["title"].values or titulo2 not in df["title"].values:
         raise ValueError("Los títulos no existen en el CSV")
 
@@ -36,17 +41,10 @@ def comparar_abstracts(csv_path="data/unified.csv", titulo1=None, titulo2=None):
     return resultados
 
 
-def compute_similarity(df, embeddings, threshold=0.75):
-    """Compara embeddings y devuelve pares con alta similitud."""
-    cosine_scores = util.cos_sim(embeddings, embeddings)
-    pairs = []
-    for i in range(len(df)):
-        for j in range(i + 1, len(df)):
-            score = cosine_scores[i][j].item()
-            if score > threshold:
-                pairs.append({
-                    "articulo_1": df.iloc[i]["title"],
-                    "articulo_2": df.iloc[j]["title"],
-                    "similaridad": round(score, 3)
-                })
-    return pd.DataFrame(pairs)
+def compute_similarity(df, embeddings, threshold=0.75, top_k=None, block_size=BLOCK_SIZE):
+    """
+    Compara embeddings y devuelve pares (i < j) con similitud mayor que threshold.
+    Con top_k, los top_k vecinos de cada artículo (sobre threshold si se da).
+    Se calcula por bloques de block_size filas, sin la matriz n x n (ver blockwise.py).
+    """
+    return similar_pairs_frame(df["title"].to_numpy(), embeddings, threshold, top_k, block_size)
@@ -0,0 +1,177 @@
+# src/similarity/embedding_cache.py
+"""
+Caché persistente de embeddings (data/embeddings/<modelo>/).
+- Clave de cada texto: blake2b de 8 bytes del texto exacto (keys.npy, uint64)
+- Vectores en float16 en partes .npy que se leen con memory map; la fila i
+  de la concatenación de las partes corresponde a keys[i]
+- cache.json: modelo, dimensión y partes (archivo, filas)
+Cada ejecución codifica solo los textos que no están en la caché y los
+agrega como una parte nueva; si ya están todos no se carga el modelo.
+Sobre MAX_CACHE_PARTS partes se compactan en una sola.
+"""
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+EMBEDDINGS_DIR = os.path.join(BASE_DIR, "data/embeddings")
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CACHE_FILE = "cache.json"
+KEYS_FILE = "keys.npy"
+CACHE_VERSION = 1
+MAX_CACHE_PARTS = 16
+
+
+def text_keys(texts):
+    """Clave uint64 de cada texto (blake2b del texto en UTF-8)."""
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(str(t).encode("utf-8"), digest_size=8).digest(), "little") for t in texts],
+        dtype=np.uint64
+    )
+
+
+def model_dir_name(model_name):
+    """Nombre de carpeta seguro para el modelo (sentence-transformers/x -> sentence-transformers_x)."""
+    return re.sub(r"[^\w.-]+", "_", model_name)
+
+
+class EmbeddingCache:
+    """Embeddings de un modelo indexados por la clave del texto, en float16 con memory map."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, cache_dir=EMBEDDINGS_DIR):
+        self.model_name = model_name
+        self.path = os.path.join(cache_dir, model_dir_name(model_name))
+        self.dim = None
+        self.parts = []  # [{"file": ..., "rows": ...}]
+        self.keys = np.empty(0, dtype=np.uint64)
+        self._index = None
+        self._load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.path, CACHE_FILE), encoding="utf-8") as f:
+                state = json.load(f)
+            keys = np.load(os.path.join(self.path, KEYS_FILE))
+        except (OSError, ValueError):
+            return
+        # Una caché de otra versión, de otro modelo o a medio escribir se descarta
+        if (state.get("version") != CACHE_VERSION or state.get("model") != self.model_name
+                or sum(p["rows"] for p in state.get("parts", [])) != len(keys)):
+            print(f"⚠️ Caché de embeddings inválida, se reconstruye: {self.path}")
+            return
+        self.dim, self.parts, self.keys = state["dim"], state["parts"], keys
+
+    def _save(self):
+        keys_tmp = os.path.join(self.path, KEYS_FILE + ".tmp")
+        with open(keys_tmp, "wb") as f:
+            np.save(f, self.keys)
+        state_tmp = os.path.join(self.path, CACHE_FILE + ".tmp")
+        with open(state_tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "model": self.model_name, "dim": self.dim, "parts": self.parts},
+                      f, indent=2)
+        os.replace(keys_tmp, os.path.join(self.path, KEYS_FILE))
+        os.replace(state_tmp, os.path.join(self.path, CACHE_FILE))
+
+    def _matrices(self):
+        return [np.load(os.path.join(self.path, p["file"]), mmap_mode="r") for p in self.parts]
+
+    def lookup(self, keys):
+        """Fila de cada clave en la caché (-1 si no está)."""
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        if self._index is None:
+            self._index = pd.Index(self.keys)
+        return self._index.get_indexer(keys)
+
+    def rows(self, positions):
+        """Vectores (float32) de las filas dadas, leídos de las partes con memory map."""
+        result = np.empty((len(positions), self.dim or 0), dtype=np.float32)
+        offsets = np.cumsum([0] + [p["rows"] for p in self.parts])
+        part_of = np.searchsorted(offsets, positions, side="right") - 1
+        for k, matrix in enumerate(self._matrices()):
+            selected = np.flatnonzero(part_of == k)
+            if len(selected):
+                result[selected] = matrix[positions[selected] - offsets[k]]
+        return result
+
+    def add(self, keys, vectors):
+        """Agrega una parte con claves nuevas (sin repetidos) y sus vectores."""
+        vectors = np.asarray(vectors, dtype=np.float16)
+        if not len(keys):
+            return
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimensión {vectors.shape[1]} distinta de la caché ({self.dim})")
+        os.makedirs(self.path, exist_ok=True)
+        part = f"part-{len(self.keys):09d}.npy"  # nombrada por su primera fila
+        np.save(os.path.join(self.path, part), vectors)
+        self.dim = vectors.shape[1]
+        self.parts.append({"file": part, "rows": len(keys)})
+        self.keys = np.concatenate([self.keys, np.asarray(keys, dtype=np.uint64)])
+        self._index = None
+        if len(self.parts) > MAX_CACHE_PARTS:
+            self.compact()
+        else:
+            self._save()
+
+    def compact(self):
+        """Reescribe todas las partes en una sola; las anteriores se borran después de guardar el estado."""
+        if len(self.parts) < 2:
+            return
+        part = f"compact-{len(self.keys):09d}.npy"
+        tmp = os.path.join(self.path, part + ".tmp")
+        merged = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float16, shape=(len(self.keys), self.dim))
+        start = 0
+        for matrix in self._matrices():
+            merged[start:start + len(matrix)] = matrix
+            start += len(matrix)
+        merged.flush()
+        del merged
+        old = [p["file"] for p in self.parts]
+        os.replace(tmp, os.path.join(self.path, part))
+        self.parts = [{"file": part, "rows": len(self.keys)}]
+        self._save()
+        for f in old:
+            os.remove(os.path.join(self.path, f))
+
+    def embed(self, texts, encode):
+        """
+        Embeddings (float32, una fila por texto) de texts. encode(lista de textos)
+        solo se llama con los textos que faltan en la caché, sin repetidos.
+        """
+        texts = list(texts)
+        keys = text_keys(texts)
+        positions = self.lookup(keys)
+        missing = np.flatnonzero(positions < 0)
+        if len(missing):
+            _, first = np.unique(keys[missing], return_index=True)
+            first = missing[np.sort(first)]
+            print(f"🧮 Embeddings nuevos: {len(first)} (en caché: {len(texts) - len(missing)})")
+            vectors = encode([texts[i] for i in first])
+            if hasattr(vectors, "detach"):
+                vectors = vectors.detach().cpu().numpy()
+            self.add(keys[first], vectors)
+            positions = self.lookup(keys)
+        else:
+            print(f"♻️ Embeddings desde la caché: {len(texts)}")
+        return self.rows(positions)
+
+
+def cached_embeddings(texts, model_name=DEFAULT_MODEL, model=None, cache_dir=EMBEDDINGS_DIR):
+    """
+    Embeddings de texts desde la caché del modelo; solo los textos nuevos se
+    codifican, y el modelo se carga únicamente si hace falta (o se usa model).
+    """
+    def encode(missing):
+        # Import diferido: ai_models carga modelos al importarse
+        from src.similarity.ai_models import load_sentence_model
+        from src.similarity.vector_models import compute_embeddings
+        return compute_embeddings(model or load_sentence_model(model_name), missing)
+
+    return EmbeddingCache(model_name, cache_dir).embed(texts, encode)
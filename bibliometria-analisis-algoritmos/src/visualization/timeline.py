@@ -15,7 +15,7 @@ def plot_timeline_by_year(df, year_col='year', out_path='data/visualization/time
 
 def plot_timeline_by_journal(df, year_col='year', journal_col='journal', out_path='data/visualization/timeline_journal.png'):
     df['year4'] = df[year_col].astype(str).str.extract(r'(\d{4})')[0]
-    pivot = df.groupby(['year4', journal_col]).size().unstack(fill_value=0)
+    pivot = df.groupby(['year4', journal_col], observed=True).size().unstack(fill_value=0)
     pivot.plot(kind='line', figsize=(12,6))
     plt.title("Publicaciones por año y revista")
     plt.tight_layout()
@@ -25,6 +25,10 @@ st.set_page_config(
 # Agregar directorio al path
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
+from src.download.unified_store import load_unified, unified_available
+
+UNIFIED_DIR = "data/download"
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -286,18 +290,22 @@ elif page == "📥 Descarga de Artículos":
     st.markdown('<div class="info-box">Extrae artículos académicos de bases de datos abiertas usando APIs REST</div>', unsafe_allow_html=True)
     
     with st.form("download_form"):
-        query = st.text_input(
-            "🔎 Cadena de búsqueda:",
+        query = st.text_area(
+            "🔎 Cadena(s) de búsqueda:",
             placeholder="Ejemplo: machine learning algorithms",
-            help="Ingresa términos de búsqueda en inglés para mejores resultados"
+            help="Ingresa términos de búsqueda en inglés para mejores resultados. "
+                 "Una consulta por línea para descargar un lote sin repetir artículos",
+            height=80
         )
         
         col1, col2 = st.columns(2)
         
         with col1:
+            import src.download.downloader  # noqa: F401  (registra las fuentes)
+            from src.download.sources import available_sources
             sources = st.multiselect(
                 "📚 Bases de datos:",
-                ["openalex", "arxiv", "pubmed"],
+                available_sources(),
                 default=["openalex"],
                 help="Selecciona una o más bases de datos"
             )
@@ -311,10 +319,46 @@ elif page == "📥 Descarga de Artículos":
                 help="Cantidad de artículos a descargar de cada base"
             )
         
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            use_cache = st.checkbox(
+                "💾 Usar caché local",
+                value=True,
+                help="Reutiliza respuestas ya descargadas (data/download/.cache) durante 24 h"
+            )
+        
+        with col4:
+            replay = st.checkbox(
+                "📴 Modo offline (solo caché)",
+                value=False,
+                help="Sirve todo desde la caché sin conectarse a las APIs"
+            )
+        
+        incremental = st.checkbox(
+            "🆕 Descarga incremental",
+            value=False,
+            help="Omite los artículos ya descargados (DOI, PMC, arXiv) y agrega solo los nuevos"
+        )
+        
+        near_duplicates = st.checkbox(
+            "🧬 Detectar casi-duplicados",
+            value=False,
+            help="Fusiona versiones del mismo artículo con títulos o abstracts casi iguales (MinHash-LSH, Jaccard ≥ 0.8)"
+        )
+        
+        deadline = st.number_input(
+            "⏱️ Tiempo límite (segundos):",
+            min_value=10,
+            max_value=1800,
+            value=120,
+            help="Al vencer se detienen las fuentes pendientes y se conserva lo ya descargado"
+        )
+        
         submitted = st.form_submit_button("🚀 Iniciar Descarga", use_container_width=True)
     
     if submitted:
-        if not query:
+        if not query.strip():
             st.error("❌ Debes ingresar una cadena de búsqueda")
         elif not sources:
             st.error("❌ Debes seleccionar al menos una base de datos")
@@ -322,12 +366,35 @@ elif page == "📥 Descarga de Artículos":
             try:
                 with st.spinner("⏳ Descargando artículos... Esto puede tomar unos minutos."):
                     from src.download.downloader import run_all
+                    from src.download.batch import run_batch, unique_queries
                     from src.download.merger import merge_and_deduplicate
+                    from src.download.http_cache import ResponseCache
+                    from src.download.telemetry import Telemetry
                     
-                    asyncio.run(run_all(query=query, sources=sources, max_results=max_results))
-                    merge_and_deduplicate()
+                    cache = ResponseCache(replay=replay) if (use_cache or replay) else None
+                    telemetry = Telemetry()
+                    queries = unique_queries(query.splitlines())
+                    if len(queries) > 1:
+                        saved = asyncio.run(run_batch(queries=queries, sources=sources, max_results=max_results,
+                                                      cache=cache, incremental=incremental, deadline=deadline,
+                                                      telemetry=telemetry))
+                    else:
+                        saved = asyncio.run(run_all(query=queries[0], sources=sources, max_results=max_results,
+                                                    cache=cache, incremental=incremental, deadline=deadline,
+                                                    telemetry=telemetry))
+                    merge_and_deduplicate(near_duplicates=near_duplicates)
                 
                 st.markdown('<div class="success-box">✅ Descarga completada exitosamente</div>', unsafe_allow_html=True)
+                st.caption(" · ".join(f"{name}: {count} artículos" for name, count in saved.items()))
+                
+                with st.expander("📈 Métricas de descarga por fuente"):
+                    metrics = pd.DataFrame(telemetry.to_dict().values())
+                    if not metrics.empty:
+                        st.dataframe(metrics.drop(columns=["latency_histogram"]).set_index("source"),
+                                     use_container_width=True)
+                        histogram = pd.DataFrame({name: data["latency_histogram"]
+                                                  for name, data in telemetry.to_dict().items()})
+                        st.bar_chart(histogram)
                 
                 unified_path = "data/download/unified.csv"
                 if os.path.exists(unified_path):
@@ -355,12 +422,10 @@ elif page == "🔍 Análisis de Similitud":
     
     st.markdown('<div class="info-box">Identifica artículos similares usando embeddings de transformers</div>', unsafe_allow_html=True)
     
-    unified_path = "data/download/unified.csv"
-    
-    if not os.path.exists(unified_path):
+    if not unified_available(UNIFIED_DIR):
         st.markdown('<div class="warning-box">⚠️ Primero debes ejecutar el módulo de Descarga</div>', unsafe_allow_html=True)
     else:
-        df = pd.read_csv(unified_path)
+        df = load_unified(UNIFIED_DIR, columns=["title", "abstract"])
         st.info(f"📄 Artículos disponibles para análisis: **{len(df)}**")
         
         threshold = st.slider(
@@ -375,13 +440,10 @@ elif page == "🔍 Análisis de Similitud":
         if st.button("🔍 Analizar Similitudes", use_container_width=True):
             try:
                 with st.spinner("⏳ Calculando similitudes... Esto puede tomar varios minutos."):
-                    from src.similarity.ai_models import load_sentence_model
-                    from src.similarity.vector_models import compute_embeddings
+                    from src.similarity.embedding_cache import cached_embeddings
                     from src.similarity.compare import compute_similarity
                     
                     progress_text = st.empty()
-                    progress_text.text("🤖 Cargando modelo...")
-                    model = load_sentence_model()
                     
                     progress_text.text("🔧 Preprocesando...")
                     df_clean = df[df['abstract'].notna()].copy()
@@ -391,8 +453,8 @@ elif page == "🔍 Análisis de Similitud":
                         st.error("❌ No hay abstracts válidos")
                         st.stop()
                     
-                    progress_text.text("🧮 Generando embeddings...")
-                    embeddings = compute_embeddings(model, df_clean['abstract'].tolist())
+                    progress_text.text("🧮 Generando embeddings (solo los abstracts nuevos)...")
+                    embeddings = cached_embeddings(df_clean['abstract'].tolist())
                     
                     progress_text.text("🔗 Calculando similitudes...")
                     sim_df = compute_similarity(df_clean, embeddings, threshold=threshold)
@@ -426,12 +488,10 @@ elif page == "📊 Estadísticas y Reportes":
     
     st.markdown('<div class="info-box">Genera reportes con métricas bibliométricas detalladas</div>', unsafe_allow_html=True)
     
-    unified_path = "data/download/unified.csv"
-    
-    if not os.path.exists(unified_path):
+    if not unified_available(UNIFIED_DIR):
         st.markdown('<div class="warning-box">⚠️ Primero debes ejecutar el módulo de Descarga</div>', unsafe_allow_html=True)
     else:
-        df = pd.read_csv(unified_path)
+        df = load_unified(UNIFIED_DIR, columns=["authors", "journal", "year"])
         
         st.markdown("### 📈 Métricas Generales")
         col1, col2, col3, col4 = st.columns(4)
@@ -479,9 +539,7 @@ elif page == "🌳 Clustering Jerárquico":
     
     st.markdown('<div class="info-box">Agrupa artículos similares usando algoritmos de clustering</div>', unsafe_allow_html=True)
     
-    unified_path = "data/download/unified.csv"
-    
-    if not os.path.exists(unified_path):
+    if not unified_available(UNIFIED_DIR):
         st.markdown('<div class="warning-box">⚠️ Primero debes ejecutar el módulo de Descarga</div>', unsafe_allow_html=True)
     else:
         method = st.selectbox(